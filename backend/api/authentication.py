@@ -0,0 +1,130 @@
+"""
+JWT authentication that doesn't load the user from the database on every
+request.
+
+Access tokens carry the user's ID, username, roles and a permission version
+(see add_auth_claims). ClaimsJWTAuthentication checks the version against
+the user's current AuthState, which is kept in a per-process memo for
+settings.AUTH_STATE_TTL seconds, and builds request.user from the token
+and the memo. Most requests therefore need no database query to
+authenticate or to check permissions.
+
+The version is a keyed hash of the user's active and superuser flags,
+password hash and roles. Changing any of them changes the version, so older
+access tokens are rejected with the "token_stale" code and the client has
+to use its refresh token to get a token with the new roles. Other workers
+notice the change within AUTH_STATE_TTL seconds.
+"""
+
+import time
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+ROLES_CLAIM = "roles"
+VERSION_CLAIM = "pv"
+USERNAME_CLAIM = "username"
+
+
+class AuthState:
+    """What authentication needs to know about a user, loaded in one go."""
+
+    def __init__(self, user):
+        self.username = user.username
+        self.is_active = user.is_active
+        self.is_superuser = user.is_superuser
+        self.is_staff = user.is_staff
+        self.roles = sorted(group.name for group in user.groups.all())
+        self.version = permission_version(user, self.roles)
+        self.permissions = frozenset(
+            user.get_all_permissions()
+            if user.is_active and not user.is_superuser
+            else ()
+        )
+
+
+_auth_states = {}
+
+
+def permission_version(user, roles):
+    """Returns the permission version of user for the given role names."""
+    value = ":".join(
+        [str(user.is_active), str(user.is_superuser), user.password, ",".join(roles)]
+    )
+    return salted_hmac("api.permission_version", value).hexdigest()[:16]
+
+
+def get_auth_state(user_id):
+    """Returns the AuthState of a user, or None if the user doesn't exist."""
+    now = time.monotonic()
+    cached = _auth_states.get(user_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    user = User.objects.filter(pk=user_id).prefetch_related("groups").first()
+    state = AuthState(user) if user is not None else None
+    _auth_states[user_id] = (now + settings.AUTH_STATE_TTL, state)
+    return state
+
+
+def forget_auth_state(user_id=None):
+    """Drops one user's memoized AuthState, or everyone's if user_id is None."""
+    if user_id is None:
+        _auth_states.clear()
+    else:
+        _auth_states.pop(user_id, None)
+
+
+def add_auth_claims(token, user):
+    """Adds the claims ClaimsJWTAuthentication needs to an access token."""
+    roles = sorted(group.name for group in user.groups.all())
+    token[USERNAME_CLAIM] = user.username
+    token[ROLES_CLAIM] = roles
+    token[VERSION_CLAIM] = permission_version(user, roles)
+    return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates requests from the access token claims and the memoized
+    AuthState instead of a database lookup.
+
+    request.user is an unsaved User instance with the user's ID, username,
+    flags and permissions. It can be used for permission checks, filters and
+    foreign keys, but views that need other fields or that save the user
+    must load it from the database. Tokens issued before the claims existed
+    fall back to the normal database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        state = get_auth_state(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not state.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if validated_token[VERSION_CLAIM] != state.version:
+            raise AuthenticationFailed(
+                _("Roles or credentials changed, refresh the token."),
+                code="token_stale",
+            )
+
+        user = User(
+            pk=user_id,
+            username=state.username,
+            is_active=state.is_active,
+            is_superuser=state.is_superuser,
+            is_staff=state.is_staff,
+        )
+        user._state.adding = False
+        # ModelBackend reads permissions from this cache when it is present
+        user._perm_cache = set(state.permissions)
+        user.role_names = state.roles
+        return user
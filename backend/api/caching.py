@@ -0,0 +1,75 @@
+"""
+Helpers for caching computed responses in the Django cache.
+
+Which cache backs them is chosen in settings.CACHES: a per-process
+local-memory cache in development, and a file or database cache shared by
+all workers in production. Every cached value belongs to a named cache
+("choices", "public", ...) with its own hit and miss counters, which
+`manage.py cache_stats` prints.
+"""
+
+from django.core.cache import cache
+
+CACHE_NAMES = ["choices", "taxonomic-choices", "public", "dashboard-summary"]
+STATS_KEY = "cache-stats:{name}:{event}"
+
+
+def _count(name, event):
+    key = STATS_KEY.format(name=name, event=event)
+    # add() is a no-op if the counter exists. incr() is atomic on the
+    # local-memory and database caches but not on the file cache, where the
+    # counters are approximate under concurrent load.
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, None)
+
+
+def get_or_build(name, key, build, timeout):
+    """
+    Returns the value cached under key in the named cache, calling build()
+    and caching its result on a miss.
+
+    Args:
+        name: One of CACHE_NAMES, used as key prefix and for the counters.
+        key: Identifies the value within the named cache. Must only contain
+            characters that are valid in cache keys.
+        build: Function computing the value. It must not return None.
+        timeout: Seconds to keep the value, or None to keep it until evicted.
+    """
+    full_key = f"{name}:{key}"
+    value = cache.get(full_key)
+    if value is None:
+        _count(name, "misses")
+        value = build()
+        cache.set(full_key, value, timeout)
+    else:
+        _count(name, "hits")
+    return value
+
+
+def get_stats():
+    """Returns {name: {"hits": int, "misses": int}} for every named cache."""
+    keys = {
+        (name, event): STATS_KEY.format(name=name, event=event)
+        for name in CACHE_NAMES
+        for event in ("hits", "misses")
+    }
+    values = cache.get_many(keys.values())
+    stats = {name: {"hits": 0, "misses": 0} for name in CACHE_NAMES}
+    for (name, event), key in keys.items():
+        stats[name][event] = values.get(key, 0)
+    return stats
+
+
+def reset_stats():
+    """Sets every hit and miss counter back to zero."""
+    cache.delete_many(
+        [
+            STATS_KEY.format(name=name, event=event)
+            for name in CACHE_NAMES
+            for event in ("hits", "misses")
+        ]
+    )
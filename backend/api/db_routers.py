@@ -0,0 +1,134 @@
+"""
+Routing of read-only requests to a database replica.
+
+When settings.DATABASES has a "replica" alias, views using ReplicaReadMixin
+read from it for GET requests. Everything else stays on "default", the
+primary:
+- writes
+- reads inside a transaction
+- reads of other views
+- reads by a user who wrote something within the last
+  REPLICA_MAX_LAG seconds, so they always see their own changes
+- lists whose tables changed within that window, so ETags and cached
+  responses are never built from data the replica hasn't caught up with
+
+Without a replica alias the router sends everything to "default".
+"""
+
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from .signals import get_table_versions
+
+REPLICA_ALIAS = "replica"
+PIN_KEY = "db-primary-pin:{user_id}"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def pin_to_primary(user):
+    """Sends the user's reads to the primary until the replica caught up."""
+    cache.set(PIN_KEY.format(user_id=user.pk), True, settings.REPLICA_MAX_LAG)
+
+
+def is_pinned_to_primary(user):
+    return (
+        user.is_authenticated
+        and cache.get(PIN_KEY.format(user_id=user.pk)) is not None
+    )
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router reading from the replica only while a ReplicaReadMixin
+    view allows it.
+
+    Only models of the api app are read from the replica. Auth models and
+    the django_cache table, which holds the table versions when
+    DJANGO_CACHE=db, are always read from the primary.
+    """
+
+    REPLICA_APPS = {"api"}
+
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and model._meta.app_label in self.REPLICA_APPS
+            and replica_configured()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+class PrimaryPinMiddleware:
+    """
+    Pins users to the primary after every successful write request.
+
+    Runs after the view, when DRF has authenticated request.user.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            replica_configured()
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and getattr(request, "user", None) is not None
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Mixin for API views whose GET requests may be served from the replica.
+
+    Views whose responses are tagged or cached by table version (they set
+    version_models) stay on the primary while any of those tables changed
+    within REPLICA_MAX_LAG seconds.
+    """
+
+    def use_replica(self, request):
+        if request.method not in SAFE_METHODS or not replica_configured():
+            return False
+        if is_pinned_to_primary(request.user):
+            return False
+
+        version_models = getattr(self, "version_models", ())
+        if version_models:
+            latest_change = max(get_table_versions(*version_models))
+            if time.time() - latest_change < settings.REPLICA_MAX_LAG:
+                return False
+        return True
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication and permission checks read from the primary
+        super().initial(request, *args, **kwargs)
+        if self.use_replica(request):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,149 @@
+"""
+Streaming CSV and JSON Lines exports of whole tables.
+
+Rows are read with queryset.iterator(chunk_size=...) and encoded into
+output chunks as the response is sent, optionally gzip compressed, so
+memory use stays flat no matter how large the table is.
+"""
+
+import csv
+import json
+import zlib
+from .models import Animal, Donation, Expenses, VolunteerProfile
+
+EXPORT_FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+# Rows fetched from the database per query
+CHUNK_SIZE = 2000
+
+# Encoded output is buffered up to this many bytes before being sent
+FLUSH_SIZE = 64 * 1024
+
+
+class ExportSpec:
+    """
+    Describes how to export one model.
+
+    Args:
+        queryset: Callable returning the rows to export, in export order.
+        columns: List of (column name, callable taking a row) pairs.
+    """
+
+    def __init__(self, queryset, columns):
+        self.queryset = queryset
+        self.columns = columns
+
+    @property
+    def header(self):
+        return [name for name, _ in self.columns]
+
+    def iter_values(self):
+        for obj in self.queryset().iterator(chunk_size=CHUNK_SIZE):
+            yield [value(obj) for _, value in self.columns]
+
+
+EXPORTS = {
+    "donations": ExportSpec(
+        lambda: Donation.objects.order_by("id"),
+        [
+            ("id", lambda d: d.id),
+            ("donor_name", lambda d: d.donor_name),
+            ("usd_amount", lambda d: d.usd_amount),
+            ("timestamp", lambda d: d.timestamp.isoformat()),
+        ],
+    ),
+    "expenses": ExportSpec(
+        lambda: Expenses.objects.order_by("id"),
+        [
+            ("id", lambda e: e.id),
+            ("usd_amount", lambda e: e.usd_amount),
+            ("timestamp", lambda e: e.timestamp.isoformat()),
+        ],
+    ),
+    "animals": ExportSpec(
+        lambda: Animal.objects.select_related("type").order_by("id"),
+        [
+            ("id", lambda a: a.id),
+            ("name", lambda a: a.name),
+            ("status", lambda a: a.status),
+            ("needs_review", lambda a: a.needs_review),
+            ("caregiver", lambda a: a.caregiver_id),
+            ("date_added", lambda a: a.date_added.isoformat()),
+            ("domain", lambda a: a.type.domain),
+            ("kingdom", lambda a: a.type.kingdom),
+            ("phylum", lambda a: a.type.phylum),
+            ("class_field", lambda a: a.type.class_field),
+            ("order", lambda a: a.type.order),
+            ("family", lambda a: a.type.family),
+            ("genus", lambda a: a.type.genus),
+            ("species", lambda a: a.type.species),
+        ],
+    ),
+    "volunteer_profiles": ExportSpec(
+        lambda: VolunteerProfile.objects.select_related("user")
+        .prefetch_related("user__groups")
+        .order_by("id"),
+        [
+            ("user_id", lambda p: p.user_id),
+            ("username", lambda p: p.user.username),
+            ("email", lambda p: p.user.email),
+            ("roles", lambda p: ",".join(group.name for group in p.user.groups.all())),
+            ("date_joined", lambda p: p.user.date_joined.isoformat()),
+            ("status", lambda p: p.status),
+            ("town", lambda p: p.town),
+            ("bio", lambda p: p.bio),
+            ("hobbies", lambda p: p.hobbies),
+            ("image_url", lambda p: p.image_url),
+        ],
+    ),
+}
+
+
+class _LineBuffer:
+    """File-like object whose write() just returns what was written."""
+
+    def write(self, value):
+        return value
+
+
+def iter_lines(spec, file_format):
+    """Yields the export as encoded text lines, header first for CSV."""
+    if file_format == "csv":
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(spec.header)
+        for values in spec.iter_values():
+            yield writer.writerow(values)
+        return
+
+    header = spec.header
+    for values in spec.iter_values():
+        yield json.dumps(dict(zip(header, values)), default=str) + "\n"
+
+
+def iter_chunks(lines, compress=False):
+    """
+    Groups encoded lines into chunks of about FLUSH_SIZE bytes, gzip
+    compressing them on the fly if requested.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = []
+    size = 0
+
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= FLUSH_SIZE:
+            chunk = b"".join(buffer)
+            buffer, size = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = b"".join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,167 @@
+"""
+Streaming bulk import of donations and expenses.
+
+Rows are read one at a time from CSV or JSON Lines input, validated in
+batches, and every batch is written with one bulk_create plus one fund
+ledger/rollup update inside its own transaction. Only a single batch is
+held in memory, so files of any size can be imported.
+"""
+
+import codecs
+import csv
+import json
+from itertools import islice
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from .models import Donation, Expenses
+from .serializers import DonationImportSerializer, ExpensesImportSerializer
+from .signals import bump_table_version
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+IMPORTERS = {
+    "donations": (Donation, DonationImportSerializer),
+    "expenses": (Expenses, ExpensesImportSerializer),
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Only the first errors are kept so a badly broken file can't exhaust memory
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename):
+    """Returns the import format for a file name, or None if unknown."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def find_decode_error(lines, encoding="utf-8"):
+    """
+    Returns (line number, byte offset) of the first bytes of a byte stream
+    that aren't valid in the given encoding, or None if all of it is. A BOM
+    is valid UTF-8, so this also checks files read as utf-8-sig.
+
+    import_rows() commits each batch as it goes, so files are checked with
+    this first. A bad byte halfway through would otherwise leave the earlier
+    batches imported with no report of them.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    number = offset = 0
+    try:
+        for number, line in enumerate(lines, start=1):
+            # Bytes of a character split across lines are still pending
+            pending = len(decoder.getstate()[0])
+            decoder.decode(line)
+            offset += len(line)
+        pending = len(decoder.getstate()[0])
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        return number, offset - pending + e.start
+    return None
+
+
+def iter_rows(lines, file_format):
+    """
+    Yields (row number, record, error) for every row of the input.
+
+    Args:
+        lines: An iterable of text lines, such as an open file.
+        file_format: "csv" (with a header row) or "jsonl".
+
+    Row numbers are the line the row starts on. Empty CSV cells are dropped
+    from the record so optional columns may be left blank. When a row can't
+    be parsed, record is None and error describes the problem.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            record = {
+                key.strip(): value
+                for key, value in row.items()
+                if key is not None and value not in (None, "")
+            }
+            yield reader.line_num, record, None
+        return
+
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Each line must be a JSON object."
+            continue
+        yield number, record, None
+
+
+class ImportReport:
+    """Counts of imported and rejected rows plus the row-level errors."""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row, error):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": error})
+
+    def to_dict(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def import_rows(kind, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Imports rows from iter_rows() as donations or expenses.
+
+    Args:
+        kind: "donations" or "expenses".
+        rows: Iterable of (row number, record, error) tuples.
+        batch_size: Number of rows validated and inserted together.
+
+    Returns:
+        ImportReport: Valid rows are created even when other rows fail.
+    """
+    model, serializer_class = IMPORTERS[kind]
+    # One serializer validates every row, the way a ListSerializer reuses its
+    # child, so its fields aren't rebuilt per row
+    validator = serializer_class()
+    report = ImportReport()
+    rows = iter(rows)
+
+    while batch := list(islice(rows, batch_size)):
+        entries = []
+        for number, record, error in batch:
+            if error is not None:
+                report.add_error(number, error)
+                continue
+
+            try:
+                entries.append(model(**validator.run_validation(record)))
+            except ValidationError as e:
+                report.add_error(number, e.detail)
+
+        if entries:
+            with transaction.atomic():
+                model.objects.bulk_create(entries)
+                model.record_batch(entries)
+            # bulk_create doesn't send post_save
+            bump_table_version(sender=model)
+            report.created += len(entries)
+
+    return report
@@ -0,0 +1,195 @@
+"""
+Password hashers with their cost taken from settings.PASSWORD_HASHING, and a
+limit on how many passwords are hashed at once.
+
+The hashers keep Django's algorithm names, so hashes stored with Django's
+defaults still verify. When a user logs in with a hash made by another
+hasher or with a different cost, Django's ModelBackend rehashes the password
+with the first hasher in settings.PASSWORD_HASHERS (see must_update), so
+changing the configured cost takes effect one login at a time.
+Bulk provisioning hashes many passwords at once with hash_passwords(), in
+a process pool sized to the slots that are free, always leaving one for
+logins.
+
+Hashing is deliberately slow and a burst of logins can keep every CPU busy.
+Views that hash run it inside hashing_slot(), which lets at most
+PASSWORD_HASHING["MAX_CONCURRENT"] hashes run at once on the host, across
+all worker processes, and answers 429 to requests that can't get a slot in
+time, so the other API requests still get CPU. The slots are lock files in
+PASSWORD_HASHING["SLOT_DIR"] (see HostSlots). Where flock() isn't
+available (Windows) the limit only applies per process.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    make_password,
+)
+from rest_framework.exceptions import Throttled
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+COST = settings.PASSWORD_HASHING
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = COST["PBKDF2_ITERATIONS"]
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = COST["SCRYPT_WORK_FACTOR"]
+    block_size = COST["SCRYPT_BLOCK_SIZE"]
+    parallelism = COST["SCRYPT_PARALLELISM"]
+    # OpenSSL refuses to use more than 32 MiB unless told otherwise. Allow
+    # what the configured cost needs, plus some headroom.
+    maxmem = 128 * block_size * (work_factor + parallelism + 2) + 2**20
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Needs the argon2-cffi package, which is only loaded when used."""
+
+    time_cost = COST["ARGON2_TIME_COST"]
+    memory_cost = COST["ARGON2_MEMORY_COST"]
+    parallelism = COST["ARGON2_PARALLELISM"]
+
+
+class HostSlots:
+    """
+    A semaphore shared by every process on the host.
+
+    Each of the size slots is a lock file in directory, held with flock().
+    The kernel drops the lock when the file is closed or its holder exits,
+    so a crashed worker can't leak a slot. acquire() and release() work like
+    those of threading.BoundedSemaphore, and any thread may release a slot
+    another thread of the same process took.
+    """
+
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.paths = [os.path.join(directory, f"slot-{i}.lock") for i in range(size)]
+        self._held = []
+        self._lock = threading.Lock()
+        # A forked child shares the parent's locks through the inherited
+        # files, so it must close them or the slots stay taken until it
+        # exits. Forking waits for acquires in progress so none is missed.
+        os.register_at_fork(
+            before=self._lock.acquire,
+            after_in_parent=self._lock.release,
+            after_in_child=self._forget_inherited,
+        )
+
+    def _forget_inherited(self):
+        for fd in self._held:
+            os.close(fd)
+        self._held = []
+        # Taken by the parent before forking
+        self._lock.release()
+
+    def _try_acquire(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            for path in self.paths:
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    continue
+                self._held.append(fd)
+                return True
+        return False
+
+    def acquire(self, blocking=True, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._try_acquire():
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(self.POLL_INTERVAL)
+        return True
+
+    def release(self):
+        with self._lock:
+            if not self._held:
+                raise ValueError("Semaphore released too many times")
+            # Closing the file drops its lock
+            os.close(self._held.pop())
+
+
+if fcntl is not None:
+    _slots = HostSlots(COST["SLOT_DIR"], COST["MAX_CONCURRENT"])
+else:
+    _slots = threading.BoundedSemaphore(COST["MAX_CONCURRENT"])
+
+
+@contextmanager
+def hashing_slot():
+    """
+    Waits up to PASSWORD_HASHING["MAX_WAIT"] seconds for a free hashing
+    slot on the host and holds it for the duration of the block.
+
+    Raises:
+        Throttled: If no slot became free in time.
+    """
+    if not _slots.acquire(timeout=COST["MAX_WAIT"]):
+        raise Throttled(
+            wait=COST["MAX_WAIT"],
+            detail="Too many passwords are being checked, please try again shortly.",
+        )
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def hash_passwords(passwords):
+    """
+    Returns make_password() of each password, hashing them in parallel.
+
+    Runs in chunks. For each chunk it waits for a hashing slot like
+    hashing_slot(), takes as many more as are free, and hashes one password
+    per slot in a process pool. It never holds more than MAX_CONCURRENT - 1
+    slots, which leaves one for logins and password changes. It gives the
+    slots back between chunks, so those requests aren't refused while a
+    cohort is hashed.
+
+    Raises:
+        Throttled: If no slot became free in time.
+    """
+    passwords = list(passwords)
+    workers = min(max(1, COST["MAX_CONCURRENT"] - 1), len(passwords))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    hashed = []
+    try:
+        while len(hashed) < len(passwords):
+            with hashing_slot():
+                wanted = min(workers, len(passwords) - len(hashed))
+                extra = 0
+                while extra + 1 < wanted and _slots.acquire(blocking=False):
+                    extra += 1
+                try:
+                    chunk = passwords[len(hashed) : len(hashed) + extra + 1]
+                    if len(chunk) == 1:
+                        hashed.append(make_password(chunk[0]))
+                    else:
+                        hashed.extend(pool.map(make_password, chunk))
+                finally:
+                    for _ in range(extra):
+                        _slots.release()
+            # Let requests waiting for a slot take it before the next chunk
+            time.sleep(0)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return hashed
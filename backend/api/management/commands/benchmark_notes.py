@@ -0,0 +1,80 @@
+import random
+import time
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from ...models import Note
+
+
+class Command(BaseCommand):
+    """
+    Command to time note listing for each role on the configured database.
+
+    Fills the notes table with generated notes spread over the boards, then
+    times Note.permitted() for a user of each role. Everything is created
+    inside a transaction that is rolled back, so the database is left as it
+    was. Run it once per DJANGO_DB_PROFILE to compare backends, e.g.:
+
+    Usage:
+        python manage.py benchmark_notes
+        DJANGO_DB_PROFILE=postgresql python manage.py benchmark_notes --notes 50000
+    """
+
+    help = "Benchmarks listing the notes each role may view."
+
+    BOARDS = ["ceo", "hr", "board", "volunteer"]
+    ROLES = ["ceo", "board", "hr", "volunteer"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=20000)
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed runs per role."
+        )
+
+    def handle(self, *args, **options):
+        groups = {group.name: group for group in Group.objects.filter(name__in=self.ROLES)}
+        if len(groups) != len(self.ROLES):
+            raise CommandError("Roles are missing, run `manage.py create_roles` first.")
+
+        self.stdout.write(
+            f"{connection.vendor}: {options['notes']} notes, "
+            f"best of {options['repeat']} runs"
+        )
+        with transaction.atomic():
+            self._run(groups, options)
+            transaction.set_rollback(True)
+
+    def _run(self, groups, options):
+        author = User.objects.create_user(username="benchmark-notes-author")
+        random.seed(0)
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=f"Note {i}",
+                    content="Benchmark note",
+                    author=author,
+                    boards=random.sample(self.BOARDS, random.randint(0, 2)),
+                )
+                for i in range(options["notes"])
+            ),
+            batch_size=2000,
+        )
+        # Let PostgreSQL plan with statistics for the new rows
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE api_note")
+
+        for role in self.ROLES:
+            user = User.objects.create_user(username=f"benchmark-notes-{role}")
+            user.groups.add(groups[role])
+            user = User.objects.get(pk=user.pk)
+
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                count = len(Note.permitted(user, "view").values_list("pk", flat=True))
+                timings.append(time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{role:<10} visible={count:<7} best={min(timings) * 1000:8.1f} ms"
+            )
@@ -0,0 +1,75 @@
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Command to measure how many logins per second each password hasher
+    allows with the costs in settings.PASSWORD_HASHING.
+
+    A login verifies one password, so the command times verify() against a
+    hash made with the configured cost. "per core" is the rate of a single
+    thread. "total" runs --workers threads at once, by default as many as
+    PASSWORD_HASHING["MAX_CONCURRENT"] lets the host hash concurrently.
+    Hashers whose library isn't installed are skipped.
+
+    Usage:
+        python manage.py benchmark_password_hashing
+        SCRYPT_WORK_FACTOR=32768 SCRYPT_PARALLELISM=1 python manage.py benchmark_password_hashing
+    """
+
+    help = "Benchmarks logins per second for each configured password hasher."
+
+    PASSWORD = "correct horse battery staple"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seconds", type=float, default=3, help="Duration of each run."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PASSWORD_HASHING["MAX_CONCURRENT"],
+            help="Threads hashing at once in the total run.",
+        )
+
+    def handle(self, *args, **options):
+        if options["seconds"] <= 0 or options["workers"] < 1:
+            raise CommandError("Need a positive duration and at least one worker.")
+
+        for index, hasher in enumerate(get_hashers()):
+            name = type(hasher).__name__ + (" (active)" if index == 0 else "")
+            try:
+                encoded = hasher.encode(self.PASSWORD, hasher.salt())
+            except ValueError as e:
+                self.stdout.write(f"{name:<40} skipped: {e}")
+                continue
+
+            per_core = self._run(hasher, encoded, 1, options["seconds"])
+            total = self._run(hasher, encoded, options["workers"], options["seconds"])
+            self.stdout.write(
+                f"{name:<40} {1000 / per_core:>7.0f} ms/login  "
+                f"logins/s per core={per_core:>6.1f}  "
+                f"total with {options['workers']} workers={total:>6.1f}"
+            )
+
+    def _run(self, hasher, encoded, workers, seconds):
+        counts = [0] * workers
+        deadline = time.monotonic() + seconds
+
+        def worker(index):
+            while time.monotonic() < deadline:
+                if not hasher.verify(self.PASSWORD, encoded):
+                    raise CommandError(f"{type(hasher).__name__} failed to verify.")
+                counts[index] += 1
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(counts) / (time.monotonic() - start)
@@ -0,0 +1,161 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Command to compare the development and production SQLite profiles under
+    concurrent load.
+
+    Each profile gets a scratch database shaped like the donation and fund
+    ledger tables. Reader threads repeatedly load the latest donations and
+    the fund total. Writer threads record donations, inserting the row and
+    updating the ledger in one transaction, like a donation POST. The
+    development profile opens a connection per operation with Django's
+    defaults. The production profile keeps one connection per thread and
+    applies settings.SQLITE_PRAGMAS and BEGIN IMMEDIATE. The app database
+    is never touched.
+
+    Usage:
+        python manage.py benchmark_sqlite
+        python manage.py benchmark_sqlite --readers 8 --writers 4 --seconds 10
+    """
+
+    help = "Benchmarks concurrent reads and writes for each SQLite profile."
+
+    SEED_ROWS = 20000
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument(
+            "--seconds", type=float, default=5, help="Duration of each run."
+        )
+
+    def handle(self, *args, **options):
+        if options["readers"] < 0 or options["writers"] < 1 or options["seconds"] <= 0:
+            raise CommandError("Need at least one writer and a positive duration.")
+
+        for profile in ("development", "production"):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "benchmark.sqlite3")
+                self._create_database(path)
+                results = self._run(profile, path, options)
+
+            seconds = options["seconds"]
+            self.stdout.write(
+                f"{profile:<12} reads/s={results['reads'] / seconds:>9.0f} "
+                f"writes/s={results['writes'] / seconds:>8.0f} "
+                f"locked errors={results['locked']}"
+            )
+
+    def _connect(self, profile, path):
+        if profile == "development":
+            # Django's sqlite3 defaults: 5 second timeout, no pragmas
+            return sqlite3.connect(path, timeout=5, isolation_level=None)
+
+        options = settings.DATABASE_PROFILES["production"]["OPTIONS"]
+        connection = sqlite3.connect(
+            path, timeout=options["timeout"], isolation_level=None
+        )
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            connection.execute(f"PRAGMA {name}={value}")
+        return connection
+
+    def _create_database(self, path):
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            """
+            CREATE TABLE donation (
+                id INTEGER PRIMARY KEY,
+                donor_name TEXT NOT NULL,
+                usd_amount INTEGER NOT NULL,
+                timestamp REAL NOT NULL
+            );
+            CREATE INDEX donation_timestamp_idx ON donation (timestamp DESC);
+            CREATE TABLE ledger (id INTEGER PRIMARY KEY, total_donations INTEGER);
+            INSERT INTO ledger VALUES (1, 0);
+            """
+        )
+        now = time.time()
+        connection.executemany(
+            "INSERT INTO donation (donor_name, usd_amount, timestamp) VALUES (?, ?, ?)",
+            ((f"donor {i}", i % 500, now - i) for i in range(self.SEED_ROWS)),
+        )
+        connection.execute(
+            "UPDATE ledger SET total_donations = (SELECT SUM(usd_amount) FROM donation)"
+        )
+        connection.commit()
+        connection.close()
+
+    def _run(self, profile, path, options):
+        results = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["seconds"]
+        begin = "BEGIN IMMEDIATE" if profile == "production" else "BEGIN"
+
+        def read(connection):
+            connection.execute(
+                "SELECT donor_name, usd_amount FROM donation "
+                "ORDER BY timestamp DESC LIMIT 50"
+            ).fetchall()
+            connection.execute("SELECT total_donations FROM ledger").fetchone()
+
+        def write(connection):
+            amount = random.randint(1, 500)
+            connection.execute(begin)
+            try:
+                connection.execute(
+                    "INSERT INTO donation (donor_name, usd_amount, timestamp) "
+                    "VALUES (?, ?, ?)",
+                    ("benchmark", amount, time.time()),
+                )
+                connection.execute(
+                    "UPDATE ledger SET total_donations = total_donations + ?",
+                    (amount,),
+                )
+                connection.execute("COMMIT")
+            except sqlite3.OperationalError:
+                connection.execute("ROLLBACK")
+                raise
+
+        def worker(operation, counter):
+            done = locked = 0
+            connection = self._connect(profile, path) if profile == "production" else None
+            while time.monotonic() < deadline:
+                # Without persistent connections every request connects anew
+                current = connection or self._connect(profile, path)
+                try:
+                    operation(current)
+                    done += 1
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    locked += 1
+                finally:
+                    if connection is None:
+                        current.close()
+            if connection is not None:
+                connection.close()
+            with lock:
+                results[counter] += done
+                results["locked"] += locked
+
+        threads = [
+            threading.Thread(target=worker, args=(read, "reads"))
+            for _ in range(options["readers"])
+        ] + [
+            threading.Thread(target=worker, args=(write, "writes"))
+            for _ in range(options["writers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
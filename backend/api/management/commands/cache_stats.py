@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from ...caching import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    """
+    Command to print the hit and miss counters of the response caches.
+
+    The counters live in the configured Django cache, so with a shared
+    production cache they cover every worker.
+
+    Usage:
+        python manage.py cache_stats
+        python manage.py cache_stats --reset
+    """
+
+    help = "Prints hit and miss counts of the response caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Set the counters back to zero after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        for name, counts in get_stats().items():
+            total = counts["hits"] + counts["misses"]
+            ratio = f"{counts['hits'] / total:.0%}" if total else "-"
+            self.stdout.write(
+                f"{name:<20} hits={counts['hits']:<8} misses={counts['misses']:<8} "
+                f"hit rate={ratio}"
+            )
+
+        if options["reset"]:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
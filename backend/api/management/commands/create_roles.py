@@ -1,328 +1,204 @@
-from django.db.models import Model
-from enum import Enum
-from django.core.management.base import BaseCommand
 from django.contrib.auth.models import Group, Permission, User
-from django.contrib.contenttypes.models import ContentType
-from ...models import Note, VolunteerProfile, Animal, News, Message, Expenses
-
-
-class ePermissionType(Enum):
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from ...models import Note, VolunteerProfile, Animal, News, Message, Expenses, Donation
+
+ALL = ("view", "add", "change", "delete")
+
+# Permissions of each role as (model, board prefix, actions). The prefix
+# selects the custom board permissions defined in the model's Meta, e.g.
+# (Note, "ceo", ("view",)) is "api.ceo_view_note". If you want to modify
+# the permissions, this is the best place to do it.
+ROLE_PERMISSIONS = {
+    "ceo": [
+        # User management permissions
+        (User, "", ALL),
+        (VolunteerProfile, "", ALL),
+        # General note permissions
+        (Note, "", ALL),
+        # Board-specific note permissions for CEO
+        (Note, "ceo", ("view", "add", "delete")),
+        (Note, "hr", ("view", "add", "delete")),
+        (Note, "board", ("view", "add", "delete")),
+        (Note, "volunteer", ("view", "add", "delete")),
+        (Animal, "", ALL),
+        (Animal, "workload", ("view",)),
+        (News, "", ALL),
+        (Message, "", ALL),
+        (Expenses, "", ALL),
+        (Donation, "", ALL),
+    ],
+    "board": [
+        (Note, "", ALL),
+        (Note, "board", ("view", "add", "delete")),
+        (VolunteerProfile, "", ("view",)),
+        (Animal, "", ALL),
+        (Animal, "workload", ("view",)),
+        (News, "", ("view", "add")),
+        (Message, "", ("view", "add")),
+    ],
+    "hr": [
+        (User, "", ALL),
+        (VolunteerProfile, "", ALL),
+        (Note, "", ALL),
+        (Note, "hr", ("view", "add", "delete")),
+        (Animal, "", ("view",)),
+        (News, "", ("view",)),
+        (Message, "", ("view", "add")),
+    ],
+    "head caregiver": [
+        (Note, "", ALL),
+        (Note, "volunteer", ("view", "add", "delete")),
+        # Board notes: view and add only
+        (Note, "board", ("view", "add")),
+        (VolunteerProfile, "", ("view",)),
+        (Animal, "", ("view", "add", "change")),
+        (Animal, "workload", ("view",)),
+        (News, "", ("view", "add", "change")),
+        (Message, "", ("view", "add")),
+    ],
+    "caregiver": [
+        (Note, "", ALL),
+        (Note, "volunteer", ("view", "add")),
+        (Note, "board", ("view", "add")),
+        (VolunteerProfile, "", ("view",)),
+        (Animal, "", ("view", "change")),
+        (News, "", ("view", "add")),
+        (Message, "", ("view", "add")),
+    ],
+    "volunteer": [
+        (Note, "", ALL),
+        (Note, "volunteer", ("view", "add", "delete")),
+        (VolunteerProfile, "", ("view", "add", "change")),
+        (Animal, "", ("view", "add")),
+        (News, "", ("view",)),
+        (Message, "", ALL),
+    ],
+}
+
+
+def _permission_keys(spec):
     """
-    Standard Django model permission types.
-
-    This enum maps to Django's default permission types that are automatically
-    created for each model. The values correspond to indices in permission lists
-    returned by _get_permissions().
-
-    Attributes:
-        VIEW (0): Permission to view/read model instances
-        ADD (1): Permission to create new model instances
-        CHANGE (2): Permission to modify existing model instances
-        DELETE (3): Permission to remove model instances
-
-    Usage:
-        permissions[ePermissionType.VIEW.value]  # Gets view permission from list
+    Returns the (app_label, model_name, codename) of every permission in a
+    role's spec.
     """
-
-    VIEW = 0
-    ADD = 1
-    CHANGE = 2
-    DELETE = 3
+    keys = set()
+    for model, prefix, actions in spec:
+        opts = model._meta
+        board = f"{prefix}_" if prefix else ""
+        for action in actions:
+            codename = f"{board}{action}_{opts.model_name}"
+            keys.add((opts.app_label, opts.model_name, codename))
+    return keys
 
 
 class Command(BaseCommand):
     """
-    Command to create roles and assign permissions to them.
-    If you want to modify the permissions, this is the best
-    place to do it.
+    Command to create the roles and sync their permissions with
+    ROLE_PERMISSIONS.
+
+    The spec is resolved with one Permission query and compared with the
+    groups' current permissions, and only the difference is written, so
+    running it on every deploy costs a few queries when nothing changed.
+    With --check nothing is written. The command lists the permissions
+    each role is missing or has in excess and fails if there are any.
 
     Usage:
         python manage.py create_roles
+        python manage.py create_roles --check
     """
 
-    def handle(self, *args, **options):
-        def _get_permissions(model: type[Model], prefix: str = "") -> list[Permission]:
-            """
-            Gets Django model permissions with optional prefix.
-
-            Retrieves the standard Django permissions (view, add, change, delete) for a model.
-            When a prefix is provided, it looks for custom permissions defined in the model's
-            Meta class that start with that prefix.
-
-            The standard permissions are created automatically by Django for all models.
-            Custom prefixed permissions (e.g. "ceo_view_note") must be explicitly defined
-            in the model's Meta class permissions list.
-
-            Args:
-                model: The model class to get permissions for
-                prefix: Optional prefix for custom model permissions (e.g. "ceo" for "ceo_view_note")
-
-            Returns:
-                list: Permission objects in order [view, add, change, delete], with None for
-                    any permissions that don't exist
-
-            Example:
-                >>> _get_permissions(Note, "ceo")
-                [<Permission: api.ceo_view_note>, <Permission: api.ceo_add_note>, ...]
-            """
-            content_type: ContentType = ContentType.objects.get_for_model(model)
-
-            if prefix != "" and prefix[-1] != "_":
-                prefix = prefix + "_"
-
-            permissions: list[Permission] = [None, None, None, None]
-
-            for permission_type in ePermissionType:
-                codename: str = (
-                    prefix + permission_type.name.lower() + "_" + model._meta.model_name
-                )
-
-                try:
-                    permission: Permission = Permission.objects.get(
-                        codename=codename,
-                        content_type=content_type,
-                    )
-                    permissions[permission_type.value] = permission
-                    print(f"Found permission: {codename}")
-                except Permission.DoesNotExist:
-                    print(f"Permission {codename} does not exist - skipping")
-                    continue
-            return permissions
-
-        # Profile permissions
-        profile_permissions = _get_permissions(VolunteerProfile)
-
-        # Note permissions
-        note_permissions = _get_permissions(Note)
+    help = "Creates the roles and syncs their permissions."
 
-        # Note permissions by board
-        ## CEO
-        ceo_note_permissions = _get_permissions(Note, "ceo")
-
-        ## HR
-        hr_note_permissions = _get_permissions(Note, "hr")
-
-        ## Board of Directors
-        board_note_permissions = _get_permissions(Note, "board")
-
-        ## Volunteers
-        volunteer_note_permissions = _get_permissions(Note, "volunteer")
-
-        # Animal permissions
-        animal_permissions = _get_permissions(Animal)
-
-        # News permissions
-        news_permissions = _get_permissions(News)
-
-        # Message permissions
-        message_permissions = _get_permissions(Message)
-
-        # Expense permissions
-        expense_permissions = _get_permissions(Expenses)
-
-        # Add User model permissions
-        user_permissions = _get_permissions(User)
-
-        # Set permissions per role
-        CEO, _ = Group.objects.get_or_create(name="ceo")
-        CEO.permissions.set(
-            [
-                # User management permissions
-                user_permissions[ePermissionType.VIEW.value],
-                user_permissions[ePermissionType.ADD.value],
-                user_permissions[ePermissionType.CHANGE.value],
-                user_permissions[ePermissionType.DELETE.value],
-                # Profile permissions
-                profile_permissions[ePermissionType.VIEW.value],
-                profile_permissions[ePermissionType.ADD.value],
-                profile_permissions[ePermissionType.CHANGE.value],
-                profile_permissions[ePermissionType.DELETE.value],
-                # General note permissions
-                note_permissions[ePermissionType.VIEW.value],
-                note_permissions[ePermissionType.ADD.value],
-                note_permissions[ePermissionType.CHANGE.value],
-                note_permissions[ePermissionType.DELETE.value],
-                # Board-specific note permissions for CEO
-                ceo_note_permissions[ePermissionType.VIEW.value],
-                ceo_note_permissions[ePermissionType.ADD.value],
-                ceo_note_permissions[ePermissionType.DELETE.value],
-                hr_note_permissions[ePermissionType.VIEW.value],
-                hr_note_permissions[ePermissionType.ADD.value],
-                hr_note_permissions[ePermissionType.DELETE.value],
-                board_note_permissions[ePermissionType.VIEW.value],
-                board_note_permissions[ePermissionType.ADD.value],
-                board_note_permissions[ePermissionType.DELETE.value],
-                volunteer_note_permissions[ePermissionType.VIEW.value],
-                volunteer_note_permissions[ePermissionType.ADD.value],
-                volunteer_note_permissions[ePermissionType.DELETE.value],
-                # Animal permissions
-                animal_permissions[ePermissionType.VIEW.value],
-                animal_permissions[ePermissionType.ADD.value],
-                animal_permissions[ePermissionType.CHANGE.value],
-                animal_permissions[ePermissionType.DELETE.value],
-                # News permissions
-                news_permissions[ePermissionType.VIEW.value],
-                news_permissions[ePermissionType.ADD.value],
-                news_permissions[ePermissionType.CHANGE.value],
-                news_permissions[ePermissionType.DELETE.value],
-                # Message permissions
-                message_permissions[ePermissionType.VIEW.value],
-                message_permissions[ePermissionType.ADD.value],
-                message_permissions[ePermissionType.CHANGE.value],
-                message_permissions[ePermissionType.DELETE.value],
-                # Expense permissions
-                expense_permissions[ePermissionType.VIEW.value],
-                expense_permissions[ePermissionType.ADD.value],
-                expense_permissions[ePermissionType.CHANGE.value],
-                expense_permissions[ePermissionType.DELETE.value],
-
-            ]
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report roles that differ from the spec, without changing them.",
         )
 
-        BOARD, _ = Group.objects.get_or_create(name="board")
-        BOARD.permissions.set(
-            [
-                # General note permissions
-                note_permissions[ePermissionType.VIEW.value],
-                note_permissions[ePermissionType.DELETE.value],
-                note_permissions[ePermissionType.ADD.value],
-                note_permissions[ePermissionType.CHANGE.value],
-                # Board-specific note permissions
-                board_note_permissions[ePermissionType.VIEW.value],
-                board_note_permissions[ePermissionType.ADD.value],
-                board_note_permissions[ePermissionType.DELETE.value],
-                # Profile permissions
-                profile_permissions[ePermissionType.VIEW.value],
-                # Animal permissions
-                animal_permissions[ePermissionType.VIEW.value],
-                animal_permissions[ePermissionType.ADD.value],
-                animal_permissions[ePermissionType.CHANGE.value],
-                animal_permissions[ePermissionType.DELETE.value],                
-                # News permissions
-                news_permissions[ePermissionType.VIEW.value],
-                news_permissions[ePermissionType.ADD.value],
-                # Message permissions
-                message_permissions[ePermissionType.VIEW.value],
-                message_permissions[ePermissionType.ADD.value],
-            ]
-        )
-
-        HR, _ = Group.objects.get_or_create(name="hr")
-        HR.permissions.set(
-            [
-                # User management permissions
-                user_permissions[ePermissionType.VIEW.value],
-                user_permissions[ePermissionType.ADD.value],
-                user_permissions[ePermissionType.CHANGE.value],
-                user_permissions[ePermissionType.DELETE.value],
-                # Profile permissions
-                profile_permissions[ePermissionType.VIEW.value],
-                profile_permissions[ePermissionType.ADD.value],
-                profile_permissions[ePermissionType.CHANGE.value],
-                profile_permissions[ePermissionType.DELETE.value],
-                # General note permissions
-                note_permissions[ePermissionType.VIEW.value],
-                note_permissions[ePermissionType.ADD.value],
-                note_permissions[ePermissionType.CHANGE.value],
-                note_permissions[ePermissionType.DELETE.value],
-                # HR-specific note permissions
-                hr_note_permissions[ePermissionType.VIEW.value],
-                hr_note_permissions[ePermissionType.ADD.value],
-                hr_note_permissions[ePermissionType.DELETE.value],
-                # Animal permissions
-                animal_permissions[ePermissionType.VIEW.value],
-                # News permissions
-                news_permissions[ePermissionType.VIEW.value],
-                # Message permissions
-                message_permissions[ePermissionType.VIEW.value],
-                message_permissions[ePermissionType.ADD.value],
-            ]
-        )
-
-        HEAD_CAREGIVER, _ = Group.objects.get_or_create(name="head caregiver")
-        HEAD_CAREGIVER.permissions.set(
-            [
-                # General note permissions
-                note_permissions[ePermissionType.VIEW.value],
-                note_permissions[ePermissionType.ADD.value],
-                note_permissions[ePermissionType.CHANGE.value],
-                note_permissions[ePermissionType.DELETE.value],
-                # Volunteer board note permissions
-                volunteer_note_permissions[ePermissionType.VIEW.value],
-                volunteer_note_permissions[ePermissionType.ADD.value],
-                volunteer_note_permissions[ePermissionType.DELETE.value],
-                # Board note permissions (view and add only)
-                board_note_permissions[ePermissionType.VIEW.value],
-                board_note_permissions[ePermissionType.ADD.value],
-                # Profile permissions (view only)
-                profile_permissions[ePermissionType.VIEW.value],
-                # Animal permissions
-                animal_permissions[ePermissionType.VIEW.value],
-                animal_permissions[ePermissionType.ADD.value],
-                animal_permissions[ePermissionType.CHANGE.value],
-                # News permissions
-                news_permissions[ePermissionType.VIEW.value],
-                news_permissions[ePermissionType.ADD.value],
-                news_permissions[ePermissionType.CHANGE.value],
-                # Message permissions
-                message_permissions[ePermissionType.VIEW.value],
-                message_permissions[ePermissionType.ADD.value],
-            ]
-        )
-
-        CAREGIVER, _ = Group.objects.get_or_create(name="caregiver")
-        CAREGIVER.permissions.set(
-            [
-                # General note permissions
-                note_permissions[ePermissionType.VIEW.value],
-                note_permissions[ePermissionType.ADD.value],
-                note_permissions[ePermissionType.CHANGE.value],
-                note_permissions[ePermissionType.DELETE.value],
-                # Volunteer board note permissions
-                volunteer_note_permissions[ePermissionType.VIEW.value],
-                volunteer_note_permissions[ePermissionType.ADD.value],
-                # Board note permissions (view and add only)
-                board_note_permissions[ePermissionType.VIEW.value],
-                board_note_permissions[ePermissionType.ADD.value],
-                # Profile permissions (view only)
-                profile_permissions[ePermissionType.VIEW.value],
-                # Animal permissions
-                animal_permissions[ePermissionType.VIEW.value],
-                animal_permissions[ePermissionType.CHANGE.value],
-                # News permissions
-                news_permissions[ePermissionType.VIEW.value],
-                news_permissions[ePermissionType.ADD.value],
-                # Message permissions
-                message_permissions[ePermissionType.VIEW.value],
-                message_permissions[ePermissionType.ADD.value],
-            ]
-        )
-
-        VOLUNTEER, _ = Group.objects.get_or_create(name="volunteer")
-        VOLUNTEER.permissions.set(
-            [
-                # General note permissions
-                note_permissions[ePermissionType.VIEW.value],
-                note_permissions[ePermissionType.ADD.value],
-                note_permissions[ePermissionType.CHANGE.value],
-                note_permissions[ePermissionType.DELETE.value],
-                # Volunteer board note permissions
-                volunteer_note_permissions[ePermissionType.VIEW.value],
-                volunteer_note_permissions[ePermissionType.ADD.value],
-                volunteer_note_permissions[ePermissionType.DELETE.value],
-                # Profile permissions
-                profile_permissions[ePermissionType.VIEW.value],
-                profile_permissions[ePermissionType.ADD.value],
-                profile_permissions[ePermissionType.CHANGE.value],
-                # Animal permissions
-                animal_permissions[ePermissionType.VIEW.value],
-                animal_permissions[ePermissionType.ADD.value],
-                # News permissions
-                news_permissions[ePermissionType.VIEW.value],
-                # Message permissions
-                message_permissions[ePermissionType.VIEW.value],
-                message_permissions[ePermissionType.ADD.value],
-                message_permissions[ePermissionType.CHANGE.value],
-                message_permissions[ePermissionType.DELETE.value],
-            ]
+    def handle(self, *args, **options):
+        wanted = {
+            role: _permission_keys(spec) for role, spec in ROLE_PERMISSIONS.items()
+        }
+        all_keys = set().union(*wanted.values())
+
+        permissions = {
+            (app_label, model, codename): pk
+            for pk, app_label, model, codename in Permission.objects.filter(
+                content_type__app_label__in={key[0] for key in all_keys},
+                content_type__model__in={key[1] for key in all_keys},
+                codename__in={key[2] for key in all_keys},
+            ).values_list(
+                "pk", "content_type__app_label", "content_type__model", "codename"
+            )
+        }
+        codenames = {pk: f"{key[0]}.{key[2]}" for key, pk in permissions.items()}
+        for app_label, _, codename in sorted(all_keys - permissions.keys()):
+            self.stderr.write(
+                f"Permission {app_label}.{codename} does not exist - skipping"
+            )
+
+        groups = {group.name: group for group in Group.objects.filter(name__in=wanted)}
+        current = {}
+        for group_id, permission_id in Group.permissions.through.objects.filter(
+            group__in=groups.values()
+        ).values_list("group_id", "permission_id"):
+            current.setdefault(group_id, set()).add(permission_id)
+
+        changes = []
+        for role, keys in wanted.items():
+            target = {permissions[key] for key in keys if key in permissions}
+            group = groups.get(role)
+            existing = current.get(group.pk, set()) if group else set()
+            added, removed = target - existing, existing - target
+            if group is None or added or removed:
+                changes.append((role, added, removed))
+
+        list_permissions = options["verbosity"] > 1 or (
+            options["check"] and options["verbosity"] > 0
         )
+        removed_ids = set().union(*(removed for _, _, removed in changes))
+        if list_permissions and removed_ids:
+            # Permissions outside the spec weren't loaded above
+            for pk, app_label, codename in Permission.objects.filter(
+                pk__in=removed_ids
+            ).values_list("pk", "content_type__app_label", "codename"):
+                codenames[pk] = f"{app_label}.{codename}"
+
+        for role, added, removed in changes:
+            if options["verbosity"] > 0:
+                self.stdout.write(
+                    f"{role}{' (new role)' if role not in groups else ''}: "
+                    f"+{len(added)} -{len(removed)}"
+                )
+            if list_permissions:
+                for pk in sorted(added, key=codenames.get):
+                    self.stdout.write(f"  + {codenames[pk]}")
+                for pk in sorted(removed, key=codenames.get):
+                    self.stdout.write(f"  - {codenames[pk]}")
+
+        if options["check"]:
+            if changes:
+                raise CommandError(
+                    f"{len(changes)} role(s) differ from the spec, "
+                    "run `manage.py create_roles` to sync them."
+                )
+            if options["verbosity"] > 0:
+                self.stdout.write("Roles match the spec.")
+            return
+
+        if not changes:
+            if options["verbosity"] > 0:
+                self.stdout.write("Roles are up to date.")
+            return
+
+        # add() and remove() send m2m_changed, which bumps the Group table
+        # version and drops the memoized auth state of the roles' users
+        with transaction.atomic():
+            for role, added, removed in changes:
+                group = groups.get(role) or Group.objects.create(name=role)
+                if added:
+                    group.permissions.add(*added)
+                if removed:
+                    group.permissions.remove(*removed)
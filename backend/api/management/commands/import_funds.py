@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...fund_import import (
+    DEFAULT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    IMPORTERS,
+    detect_format,
+    find_decode_error,
+    import_rows,
+    iter_rows,
+)
+
+
+class Command(BaseCommand):
+    """
+    Command to bulk import donations or expenses from a CSV or JSON Lines
+    file, such as a payment processor export.
+
+    CSV files need a header row naming the columns (donor_name, usd_amount
+    and optionally timestamp). The file is streamed, so it is never loaded
+    into memory as a whole.
+
+    Usage:
+        python manage.py import_funds donations export.csv
+        python manage.py import_funds expenses expenses.jsonl --batch-size 5000
+    """
+
+    help = "Bulk imports donations or expenses from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=list(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=IMPORT_FORMATS,
+            help="Input format, detected from the file extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Rows validated and inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or detect_format(options["path"])
+        if file_format is None:
+            raise CommandError("Could not detect the file format, pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        try:
+            # Every batch is committed as it is imported, so check the
+            # encoding of the whole file before writing anything
+            with open(options["path"], "rb") as raw:
+                decode_error = find_decode_error(raw)
+            if decode_error is not None:
+                line, offset = decode_error
+                raise CommandError(
+                    f"{options['path']} must be UTF-8 encoded, "
+                    f"line {line} is not (byte {offset}). Nothing was imported."
+                )
+            with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+                report = import_rows(
+                    options["kind"],
+                    iter_rows(lines, file_format),
+                    batch_size=options["batch_size"],
+                )
+        except OSError as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        for error in report.errors:
+            self.stdout.write(
+                self.style.WARNING(f"Row {error['row']}: {error['errors']}")
+            )
+        if report.failed > len(report.errors):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"... {report.failed - len(report.errors)} more failed rows"
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report.created} {options['kind']}, {report.failed} rows failed."
+            )
+        )
@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from ...models import FundLedger, FundMonthlyRollup
+
+
+class Command(BaseCommand):
+    """
+    Command to rebuild the fund ledger and the monthly fund rollups from the
+    raw Donation and Expenses tables and report any drift from the stored
+    totals.
+
+    Usage:
+        python manage.py rebuild_fund_ledger
+        python manage.py rebuild_fund_ledger --check
+    """
+
+    help = "Rebuilds and verifies the running fund totals and monthly rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only verify the ledger, exit with an error if it has drifted.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ledger_in_sync = self._check_ledger()
+            rollups_in_sync = self._check_rollups()
+
+            if ledger_in_sync and rollups_in_sync:
+                return
+            if options["check"]:
+                raise CommandError("Fund totals do not match the raw tables.")
+
+            FundLedger.rebuild()
+            FundMonthlyRollup.rebuild()
+            self.stdout.write(self.style.SUCCESS("Ledger and rollups rebuilt."))
+
+    def _check_ledger(self):
+        ledger = FundLedger.objects.filter(pk=FundLedger.LEDGER_ID).first()
+        actual = FundLedger.compute_totals()
+        stored = (ledger.total_donations, ledger.total_expenses) if ledger else None
+
+        if stored == actual:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Ledger is in sync: donations={actual[0]} expenses={actual[1]}"
+                )
+            )
+            return True
+
+        self.stdout.write(
+            self.style.WARNING(f"Ledger drift: stored={stored} actual={actual}")
+        )
+        return False
+
+    def _check_rollups(self):
+        fields = ["donations_total", "donations_count", "expenses_total", "expenses_count"]
+        actual = FundMonthlyRollup.compute_rows()
+        stored = {
+            row["month"]: {field: row[field] for field in fields}
+            for row in FundMonthlyRollup.objects.values("month", *fields)
+            # Months whose transactions were all deleted are left as zero rows
+            if any(row[field] for field in fields)
+        }
+
+        drifted = sorted(
+            month
+            for month in stored.keys() | actual.keys()
+            if stored.get(month) != actual.get(month)
+        )
+        if not drifted:
+            self.stdout.write(
+                self.style.SUCCESS(f"Monthly rollups are in sync: {len(actual)} months")
+            )
+            return True
+
+        for month in drifted:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Rollup drift for {month:%Y-%m}: "
+                    f"stored={stored.get(month)} actual={actual.get(month)}"
+                )
+            )
+        return False
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from ...search import get_backend
+
+
+class Command(BaseCommand):
+    """
+    Command to rebuild the full-text search index for news, notes and
+    messages from scratch. The index is normally kept up to date on every
+    save and delete, so this is only needed after bulk changes or when
+    switching search backends.
+
+    Usage:
+        python manage.py rebuild_search_index
+    """
+
+    help = "Rebuilds the full-text search index."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Search index rebuilt ({type(backend).__name__}).")
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_donation_timestamp_expenses_timestamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='volunteerprofile',
+            index=models.Index(fields=['status'], name='profile_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteerprofile',
+            index=models.Index(fields=['town'], name='profile_town_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:26
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def build_ledger(apps, schema_editor):
+    Donation = apps.get_model("api", "Donation")
+    Expenses = apps.get_model("api", "Expenses")
+    FundLedger = apps.get_model("api", "FundLedger")
+    FundLedger.objects.create(
+        pk=1,
+        total_donations=Donation.objects.aggregate(total=Sum("usd_amount"))["total"] or 0,
+        total_expenses=Expenses.objects.aggregate(total=Sum("usd_amount"))["total"] or 0,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_volunteerprofile_profile_status_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FundLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_donations', models.BigIntegerField(default=0)),
+                ('total_expenses', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:27
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    FundMonthlyRollup = apps.get_model("api", "FundMonthlyRollup")
+    for model_name, prefix in (("Donation", "donations"), ("Expenses", "expenses")):
+        model = apps.get_model("api", model_name)
+        grouped = (
+            model.objects.annotate(period=TruncMonth("timestamp"))
+            .values("period")
+            .annotate(total=Sum("usd_amount"), count=Count("id"))
+            .order_by()
+        )
+        for row in grouped:
+            rollup, _ = FundMonthlyRollup.objects.get_or_create(month=row["period"].date())
+            setattr(rollup, f"{prefix}_total", row["total"] or 0)
+            setattr(rollup, f"{prefix}_count", row["count"])
+            rollup.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_fundledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FundMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('donations_total', models.BigIntegerField(default=0)),
+                ('donations_count', models.IntegerField(default=0)),
+                ('expenses_total', models.BigIntegerField(default=0)),
+                ('expenses_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['month'],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_fundmonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donation',
+            index=models.Index(fields=['-timestamp'], name='donation_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['-timestamp'], name='expenses_timestamp_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_donation_donation_timestamp_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donation',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='expenses',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
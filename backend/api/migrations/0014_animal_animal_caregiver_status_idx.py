@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_alter_donation_timestamp_alter_expenses_timestamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='animal',
+            index=models.Index(fields=['caregiver', 'status'], name='animal_caregiver_status_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Keep in sync with api.search.DOCUMENTS and SQLiteFTSBackend
+DOCUMENTS = [
+    ("News", 1, "title", "content"),
+    ("Note", 2, "title", "content"),
+    ("Message", 3, "subject", "body"),
+]
+ROWID_STRIDE = 4
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS api_search_index "
+            "USING fts5(title, body, tokenize='porter unicode61')"
+        )
+        for model_name, code, title_field, body_field in DOCUMENTS:
+            model = apps.get_model("api", model_name)
+            rows = model.objects.values_list("pk", title_field, body_field)
+            cursor.executemany(
+                "INSERT INTO api_search_index(rowid, title, body) VALUES (%s, %s, %s)",
+                [(pk * ROWID_STRIDE + code, title, body) for pk, title, body in rows],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS api_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_animal_animal_caregiver_status_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-date_posted'], name='news_date_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['type', '-date_posted'], name='news_type_date_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# GIN indexes only exist on PostgreSQL, where Note.boards is stored as jsonb.
+# The default jsonb_ops operator class serves the ?| (has_any_keys) lookup
+# Note.permitted() uses for viewing. It doesn't support <@ (contained_by),
+# which the delete rule uses on the single note being deleted.
+
+
+def create_boards_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS note_boards_gin_idx ON api_note USING gin (boards)"
+    )
+
+
+def drop_boards_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS note_boards_gin_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_news_news_date_posted_idx_news_news_type_date_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_boards_index, drop_boards_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:24
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_note_boards_gin_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='animal',
+            options={'permissions': [('workload_view_animal', 'Can view how many animals each caregiver is assigned.')]},
+        ),
+    ]
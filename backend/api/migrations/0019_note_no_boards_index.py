@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Viewing notes matches boards = '[]' OR boards ?| (...). The GIN index on
+# boards only serves the ?| side, so without an index for the notes that
+# have no boards PostgreSQL scans the whole table. With this partial index
+# it combines both indexes with a BitmapOr.
+
+
+def create_no_boards_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS note_no_boards_idx ON api_note (id) "
+        "WHERE boards = '[]'::jsonb"
+    )
+
+
+def drop_no_boards_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS note_no_boards_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_animal_workload_permission"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_no_boards_index, drop_no_boards_index),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import BooleanField, F, Func, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.forms import ValidationError
 from rest_framework.permissions import DjangoModelPermissions
@@ -35,6 +38,42 @@ class StrictPermissions(DjangoModelPermissions):
     }
 
 
+class JSONArrayMatch(Func):
+    """
+    SQLite condition on a JSON array of strings, which SQLite's JSONField
+    lookups can't express.
+
+    With match="any" it is true if any element is one of values. With
+    match="all" it is true if the array is not empty and every element is
+    one of values. The array is passed as an expression, so the condition
+    follows the table alias when used inside a subquery.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, expression, values, match):
+        super().__init__(expression)
+        self.values = list(values)
+        self.match = match
+
+    def as_sql(self, compiler, connection, **extra_context):
+        array, params = compiler.compile(self.source_expressions[0])
+        placeholders = ", ".join(["%s"] * len(self.values))
+        if self.match == "any":
+            sql = (
+                f"EXISTS (SELECT 1 FROM json_each({array}) "
+                f"WHERE json_each.value IN ({placeholders}))"
+            )
+            return sql, (*params, *self.values)
+
+        sql = (
+            f"(json_array_length({array}) > 0 AND NOT EXISTS "
+            f"(SELECT 1 FROM json_each({array}) "
+            f"WHERE json_each.value NOT IN ({placeholders})))"
+        )
+        return sql, (*params, *params, *self.values)
+
+
 class Note(models.Model):
     class Meta:
         permissions = [
@@ -101,6 +140,54 @@ class Note(models.Model):
                 for board in boards
             )
 
+    @classmethod
+    def permitted_boards(cls, user, action):
+        """Returns the boards the user has the <board>_<action>_note permission for."""
+        suffix = f"_{action}_note"
+        return sorted(
+            permission[len("api.") : -len(suffix)]
+            for permission in user.get_all_permissions()
+            if permission.startswith("api.") and permission.endswith(suffix)
+        )
+
+    @classmethod
+    def permitted(cls, user, action):
+        """
+        Returns a queryset of the notes the user may view or delete, with the
+        same rules as check_board_permissions: notes without boards need the
+        plain view_note/delete_note permission, viewing a note needs one of
+        its boards and deleting it needs all of them.
+
+        The rules are evaluated by the database. PostgreSQL matches the
+        boards with the jsonb ?| operator to view, which the GIN index on
+        boards serves, and the partial note_no_boards_idx index serves the
+        notes without boards. Deleting uses <@, which jsonb_ops GIN indexes
+        don't support, so it filters the rows left by the other conditions,
+        in practice the one note being deleted. SQLite expands the JSON
+        array with json_each, see JSONArrayMatch.
+        """
+        if user.is_active and user.is_superuser:
+            return cls.objects.all()
+
+        boards = cls.permitted_boards(user, action)
+        condition = models.Q(pk__in=[])
+        if user.has_perm(f"api.{action}_note"):
+            condition |= models.Q(boards=[])
+
+        if boards:
+            if connection.vendor == "postgresql":
+                if action == "view":
+                    condition |= models.Q(boards__has_any_keys=boards)
+                else:
+                    condition |= models.Q(boards__contained_by=boards) & ~models.Q(
+                        boards=[]
+                    )
+            else:
+                match = "any" if action == "view" else "all"
+                condition |= models.Q(JSONArrayMatch(F("boards"), boards, match))
+
+        return cls.objects.filter(condition)
+
 
 class UserStatus(models.TextChoices):
     ACTIVE = "active"
@@ -109,6 +196,12 @@ class UserStatus(models.TextChoices):
 
 
 class VolunteerProfile(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"], name="profile_status_idx"),
+            models.Index(fields=["town"], name="profile_town_idx"),
+        ]
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.TextField(blank=True, null=True)
     hobbies = models.TextField(blank=True, null=True)
@@ -135,42 +228,67 @@ class TaxonomicRank(models.Model):
     genus = models.CharField(max_length=50, choices=eTaxonomicGenus.choices)
     species = models.CharField(max_length=255)
 
+    RANK_FIELDS = [
+        "domain",
+        "kingdom",
+        "phylum",
+        "class_field",
+        "order",
+        "family",
+        "genus",
+    ]
+
     def clean(self):
         super().clean()
-        valid_kingdoms = TaxonomicHierarchy().TAXONOMIC_HIERARCHY.get(self.domain, {})
-        if self.kingdom not in valid_kingdoms:
+        self.validate_hierarchy(
+            {rank: getattr(self, rank) for rank in self.RANK_FIELDS}
+        )
+
+    @staticmethod
+    def validate_hierarchy(ranks):
+        """
+        Checks that each rank is a valid child of the rank above it.
+
+        Args:
+            ranks: Dict with a value for every field in RANK_FIELDS.
+
+        Raises:
+            ValidationError: For the first rank that doesn't fit the hierarchy.
+        """
+        valid_kingdoms = TaxonomicHierarchy().TAXONOMIC_HIERARCHY.get(ranks["domain"], {})
+        if ranks["kingdom"] not in valid_kingdoms:
             raise ValidationError(
-                f"Kingdom must be one of {list(valid_kingdoms.keys())} for domain {self.domain}."
+                f"Kingdom must be one of {list(valid_kingdoms.keys())} for domain {ranks['domain']}."
             )
 
-        valid_phyla = valid_kingdoms.get(self.kingdom, {})
-        if self.phylum not in valid_phyla:
+        valid_phyla = valid_kingdoms.get(ranks["kingdom"], {})
+        if ranks["phylum"] not in valid_phyla:
             raise ValidationError(
-                f"Phylum must be one of {list(valid_phyla.keys())} for kingdom {self.kingdom}."
+                f"Phylum must be one of {list(valid_phyla.keys())} for kingdom {ranks['kingdom']}."
             )
 
-        valid_classes = valid_phyla.get(self.phylum, {})
-        if self.class_field not in valid_classes:
+        valid_classes = valid_phyla.get(ranks["phylum"], {})
+        if ranks["class_field"] not in valid_classes:
             raise ValidationError(
-                f"Class must be one of {list(valid_classes.keys())} for phylum {self.phylum}."
+                f"Class must be one of {list(valid_classes.keys())} for phylum {ranks['phylum']}."
             )
 
-        valid_orders = valid_classes.get(self.class_field, {})
-        if self.order not in valid_orders:
+        valid_orders = valid_classes.get(ranks["class_field"], {})
+        if ranks["order"] not in valid_orders:
             raise ValidationError(
-                f"Order must be one of {list(valid_orders.keys())} for class {self.class_field}."
+                f"Order must be one of {list(valid_orders.keys())} for class {ranks['class_field']}."
             )
 
-        valid_families = valid_orders.get(self.order, {})
-        if self.family not in valid_families:
+        valid_families = valid_orders.get(ranks["order"], {})
+        if ranks["family"] not in valid_families:
             raise ValidationError(
-                f"Family must be one of {list(valid_families.keys())} for order {self.order}."
+                f"Family must be one of {list(valid_families.keys())} for order {ranks['order']}."
             )
 
-        valid_genera = valid_families.get(self.family, [])
-        if self.genus not in valid_genera:
+        valid_genera = valid_families.get(ranks["family"], [])
+        if ranks["genus"] not in valid_genera:
             raise ValidationError(
-                f"Genus must be one of {valid_genera} for family {self.family}."
+                f"Genus must be one of {valid_genera} for family {ranks['family']}."
             )
 
     def save(self, *args, **kwargs):
@@ -179,6 +297,20 @@ class TaxonomicRank(models.Model):
 
 
 class Animal(models.Model):
+    class Meta:
+        permissions = [
+            (
+                "workload_view_animal",
+                "Can view how many animals each caregiver is assigned.",
+            ),
+        ]
+        indexes = [
+            # Serves "animals assigned to me", optionally by status
+            models.Index(
+                fields=["caregiver", "status"], name="animal_caregiver_status_idx"
+            ),
+        ]
+
     name = models.CharField(max_length=255)
     type = models.ForeignKey(TaxonomicRank, on_delete=models.CASCADE)
     status = models.CharField(
@@ -212,6 +344,13 @@ class NewsType(models.TextChoices):
 
 
 class News(models.Model):
+    class Meta:
+        indexes = [
+            # Serve the newest-first feed, optionally narrowed to one type
+            models.Index(fields=["-date_posted"], name="news_date_posted_idx"),
+            models.Index(fields=["type", "-date_posted"], name="news_type_date_idx"),
+        ]
+
     title = models.CharField(max_length=255)
     content = models.TextField()
     date_posted = models.DateTimeField(auto_now_add=True)
@@ -222,12 +361,239 @@ class News(models.Model):
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
 
 
-class Donation(models.Model):
+class FundLedger(models.Model):
+    """
+    Running totals of all donations and expenses.
+
+    The ledger is a single row that is adjusted in the same transaction as
+    every donation or expense write, so reading the available funds never has
+    to sum the raw tables. Bulk queryset operations (update, delete,
+    bulk_create) bypass the model hooks and must call record() themselves;
+    `manage.py rebuild_fund_ledger` recomputes and verifies the totals.
+    """
+
+    LEDGER_ID = 1
+
+    total_donations = models.BigIntegerField(default=0)
+    total_expenses = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def available_funds(self):
+        return self.total_donations - self.total_expenses
+
+    @classmethod
+    def current(cls):
+        """Returns the ledger row, building it from the raw tables if missing."""
+        ledger = cls.objects.filter(pk=cls.LEDGER_ID).first()
+        if ledger is None:
+            ledger = cls.rebuild()
+        return ledger
+
+    @classmethod
+    def record(cls, donations=0, expenses=0):
+        """Adds the given amounts (which may be negative) to the totals."""
+        if not donations and not expenses:
+            return
+        updated = cls.objects.filter(pk=cls.LEDGER_ID).update(
+            total_donations=F("total_donations") + donations,
+            total_expenses=F("total_expenses") + expenses,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            # No ledger yet, the raw tables already include this write
+            cls.rebuild()
+
+    @classmethod
+    def compute_totals(cls):
+        """Returns (total donations, total expenses) summed from the raw tables."""
+        total_donations = Donation.objects.aggregate(total=Sum("usd_amount"))["total"]
+        total_expenses = Expenses.objects.aggregate(total=Sum("usd_amount"))["total"]
+        return total_donations or 0, total_expenses or 0
+
+    @classmethod
+    def rebuild(cls):
+        """Recomputes the totals from the raw tables and stores them."""
+        total_donations, total_expenses = cls.compute_totals()
+        ledger, _ = cls.objects.update_or_create(
+            pk=cls.LEDGER_ID,
+            defaults={
+                "total_donations": total_donations,
+                "total_expenses": total_expenses,
+            },
+        )
+        return ledger
+
+
+class FundMonthlyRollup(models.Model):
+    """
+    Donation and expense totals for one calendar month.
+
+    Like the FundLedger, rollup rows are adjusted in the same transaction as
+    every donation or expense write, so a monthly time series is read from one
+    row per month instead of every transaction.
+    """
+
+    class Meta:
+        ordering = ["month"]
+
+    # First day of the month, in the current time zone
+    month = models.DateField(unique=True)
+    donations_total = models.BigIntegerField(default=0)
+    donations_count = models.IntegerField(default=0)
+    expenses_total = models.BigIntegerField(default=0)
+    expenses_count = models.IntegerField(default=0)
+
+    @staticmethod
+    def month_of(timestamp):
+        """Returns the first day of the month a timestamp falls in."""
+        return timezone.localtime(timestamp).date().replace(day=1)
+
+    @classmethod
+    def record(cls, month, **deltas):
+        """
+        Adds the given deltas (e.g. donations_total=50, donations_count=1) to
+        the rollup row for a month, creating the row if needed.
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        updates = {field: F(field) + delta for field, delta in deltas.items()}
+        if not cls.objects.filter(month=month).update(**updates):
+            rollup, _ = cls.objects.get_or_create(month=month)
+            cls.objects.filter(pk=rollup.pk).update(**updates)
+
+    @classmethod
+    def compute_rows(cls):
+        """Returns {month: field values} summed from the raw tables."""
+        rows = {}
+        for model, prefix in ((Donation, "donations"), (Expenses, "expenses")):
+            grouped = (
+                model.objects.annotate(period=TruncMonth("timestamp"))
+                .values("period")
+                .annotate(total=Sum("usd_amount"), count=models.Count("id"))
+                .order_by()
+            )
+            for row in grouped:
+                values = rows.setdefault(
+                    row["period"].date(),
+                    {
+                        "donations_total": 0,
+                        "donations_count": 0,
+                        "expenses_total": 0,
+                        "expenses_count": 0,
+                    },
+                )
+                values[f"{prefix}_total"] = row["total"] or 0
+                values[f"{prefix}_count"] = row["count"]
+        return rows
+
+    @classmethod
+    def rebuild(cls):
+        """Replaces every rollup row with totals summed from the raw tables."""
+        cls.objects.all().delete()
+        cls.objects.bulk_create(
+            cls(month=month, **values) for month, values in cls.compute_rows().items()
+        )
+
+
+class LedgerEntryModel(models.Model):
+    """
+    Base class for models whose usd_amount is tracked by the FundLedger and
+    the FundMonthlyRollup rows.
+
+    Subclasses set ledger_field to the FundLedger.record() argument their
+    amounts count towards ("donations" or "expenses"), which is also the
+    prefix of their FundMonthlyRollup fields.
+    """
+
+    ledger_field = None
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = (
+                    type(self)
+                    .objects.filter(pk=self.pk)
+                    .values_list("usd_amount", "timestamp")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            if previous is None:
+                self._record(self.usd_amount, count=1)
+                return
+            previous_amount, previous_timestamp = previous
+            previous_month = FundMonthlyRollup.month_of(previous_timestamp)
+            if previous_month == FundMonthlyRollup.month_of(self.timestamp):
+                self._record(self.usd_amount - previous_amount, count=0)
+            else:
+                # Moved to another month, take it out of the old one
+                self._record(-previous_amount, count=-1, month=previous_month)
+                self._record(self.usd_amount, count=1)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self._record(-self.usd_amount, count=-1)
+        return result
+
+    @classmethod
+    def record_batch(cls, entries):
+        """
+        Adds a batch of newly created entries to the ledger and rollups with
+        one update per affected row. Call this after bulk_create, inside the
+        same transaction.
+        """
+        field = cls.ledger_field
+        months = {}
+        for entry in entries:
+            totals = months.setdefault(FundMonthlyRollup.month_of(entry.timestamp), [0, 0])
+            totals[0] += entry.usd_amount
+            totals[1] += 1
+
+        FundLedger.record(**{field: sum(total for total, _ in months.values())})
+        for month, (total, count) in months.items():
+            FundMonthlyRollup.record(
+                month, **{f"{field}_total": total, f"{field}_count": count}
+            )
+
+    def _record(self, amount, count, month=None):
+        FundLedger.record(**{self.ledger_field: amount})
+        FundMonthlyRollup.record(
+            month or FundMonthlyRollup.month_of(self.timestamp),
+            **{
+                f"{self.ledger_field}_total": amount,
+                f"{self.ledger_field}_count": count,
+            },
+        )
+
+
+class Donation(LedgerEntryModel):
+    class Meta:
+        indexes = [
+            models.Index(fields=["-timestamp"], name="donation_timestamp_idx"),
+        ]
+
+    ledger_field = "donations"
+
     donor_name = models.CharField(max_length=100)
     usd_amount = models.IntegerField(blank=False)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Defaults to now, bulk imports may carry the original transaction time
+    timestamp = models.DateTimeField(default=timezone.now)
+
+
+class Expenses(LedgerEntryModel):
+    class Meta:
+        indexes = [
+            models.Index(fields=["-timestamp"], name="expenses_timestamp_idx"),
+        ]
 
+    ledger_field = "expenses"
 
-class Expenses(models.Model):
     usd_amount = models.IntegerField(blank=False)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Defaults to now, bulk imports may carry the original transaction time
+    timestamp = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,42 @@
+from rest_framework.pagination import CursorPagination
+
+
+class VolunteerProfileCursorPagination(CursorPagination):
+    """
+    Cursor pagination for volunteer profiles.
+
+    Pages are keyed on the primary key so each page is a single indexed range
+    scan, no matter how deep into the list the client is.
+    """
+
+    ordering = "id"
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class TimestampCursorPagination(CursorPagination):
+    """
+    Keyset pagination for timestamped records such as donations and expenses,
+    newest first.
+
+    Each page continues from the last timestamp seen, which the descending
+    timestamp index serves directly.
+    """
+
+    ordering = "-timestamp"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class NewsCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the news feed, newest first, served by the
+    date_posted index.
+    """
+
+    ordering = "-date_posted"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -0,0 +1,245 @@
+"""
+Full-text search over News, Notes and Messages.
+
+Documents are indexed by a search backend chosen with the SEARCH_BACKEND
+setting. SQLiteFTSBackend keeps an FTS5 table next to the app tables and is
+used by default on SQLite; DatabaseLikeBackend falls back to plain
+substring queries and works on any database. The index is kept up to date
+incrementally by the post_save and post_delete receivers in signals.py.
+"""
+
+import re
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, models
+from django.utils.module_loading import import_string
+from .models import Message, News, Note
+
+
+class SearchDocument:
+    """
+    Describes how one model is indexed.
+
+    Args:
+        model: The model class.
+        code: Small integer unique per document type, used to build index keys.
+        title_field: Field indexed as the document title.
+        body_field: Field indexed as the document body.
+    """
+
+    def __init__(self, model, code, title_field, body_field):
+        self.model = model
+        self.code = code
+        self.title_field = title_field
+        self.body_field = body_field
+
+
+DOCUMENTS = {
+    "news": SearchDocument(News, 1, "title", "content"),
+    "note": SearchDocument(Note, 2, "title", "content"),
+    "message": SearchDocument(Message, 3, "subject", "body"),
+}
+
+DOCUMENT_TYPES = {document.model: doc_type for doc_type, document in DOCUMENTS.items()}
+
+
+class SearchBackend:
+    """
+    Base class for search backends.
+
+    Backends return the IDs of matching documents best match first, only
+    looking at the documents in the queryset they are given. search() passes
+    the documents the user may see, so permissions are applied by the
+    database in the same query as the match.
+    """
+
+    def index(self, doc_type, obj):
+        """Adds or replaces a document in the index."""
+        raise NotImplementedError
+
+    def remove(self, doc_type, doc_id):
+        """Removes a document from the index."""
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Re-indexes every document from the model tables."""
+        raise NotImplementedError
+
+    def match(self, doc_type, query, queryset, limit):
+        """Returns the IDs of up to limit matching documents in queryset."""
+        raise NotImplementedError
+
+
+class DatabaseLikeBackend(SearchBackend):
+    """
+    Backend that searches the model tables directly with case insensitive
+    substring matches. Needs no index, but scans the whole table.
+    """
+
+    def index(self, doc_type, obj):
+        pass
+
+    def remove(self, doc_type, doc_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def match(self, doc_type, query, queryset, limit):
+        document = DOCUMENTS[doc_type]
+        for term in query.split():
+            queryset = queryset.filter(
+                models.Q(**{f"{document.title_field}__icontains": term})
+                | models.Q(**{f"{document.body_field}__icontains": term})
+            )
+        return list(queryset.order_by("-pk").values_list("pk", flat=True)[:limit])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Backend using an SQLite FTS5 table, ranked by BM25.
+
+    Each document is stored under the rowid pk * ROWID_STRIDE + type code, so
+    updates and deletes are single rowid lookups and each type can be
+    matched separately.
+    """
+
+    TABLE = "api_search_index"
+    ROWID_STRIDE = 4
+
+    @classmethod
+    def create_table(cls, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.TABLE} "
+            "USING fts5(title, body, tokenize='porter unicode61')"
+        )
+
+    def _rowid(self, doc_type, doc_id):
+        return doc_id * self.ROWID_STRIDE + DOCUMENTS[doc_type].code
+
+    def index(self, doc_type, obj):
+        document = DOCUMENTS[doc_type]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE}(rowid, title, body) VALUES (%s, %s, %s)",
+                [
+                    self._rowid(doc_type, obj.pk),
+                    getattr(obj, document.title_field),
+                    getattr(obj, document.body_field),
+                ],
+            )
+
+    def remove(self, doc_type, doc_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.TABLE} WHERE rowid = %s",
+                [self._rowid(doc_type, doc_id)],
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            self.create_table(cursor)
+            cursor.execute(f"DELETE FROM {self.TABLE}")
+            for doc_type, document in DOCUMENTS.items():
+                rows = document.model.objects.values_list(
+                    "pk", document.title_field, document.body_field
+                )
+                cursor.executemany(
+                    f"INSERT INTO {self.TABLE}(rowid, title, body) VALUES (%s, %s, %s)",
+                    (
+                        (self._rowid(doc_type, pk), title, body)
+                        for pk, title, body in rows.iterator(chunk_size=2000)
+                    ),
+                )
+
+    def match(self, doc_type, query, queryset, limit):
+        expression = self._match_expression(query)
+        if not expression:
+            return []
+        try:
+            visible_sql, visible_params = (
+                queryset.order_by().values("pk").query.sql_with_params()
+            )
+        except EmptyResultSet:
+            # The queryset can't contain any document
+            return []
+
+        # The IN subquery is evaluated once, so matches are filtered and
+        # ranked in one pass and the LIMIT applies to visible documents only
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.TABLE} WHERE {self.TABLE} MATCH %s "
+                f"AND rowid %% {self.ROWID_STRIDE} = %s "
+                f"AND rowid / {self.ROWID_STRIDE} IN ({visible_sql}) "
+                "ORDER BY rank LIMIT %s",
+                [expression, DOCUMENTS[doc_type].code, *visible_params, limit],
+            )
+            return [rowid // self.ROWID_STRIDE for rowid, in cursor.fetchall()]
+
+    @staticmethod
+    def _match_expression(query):
+        """
+        Turns user input into an FTS5 query matching every word, with the
+        last word as a prefix so partially typed words still match.
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return ""
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+
+_backend = None
+
+
+def get_backend():
+    """Returns the configured search backend instance."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "SEARCH_BACKEND", None)
+        if path is None:
+            path = (
+                "api.search.SQLiteFTSBackend"
+                if connection.vendor == "sqlite"
+                else "api.search.DatabaseLikeBackend"
+            )
+        _backend = import_string(path)()
+    return _backend
+
+
+def visible_documents(user, doc_type):
+    """
+    Returns a queryset of the documents of a type the user may see, with
+    the same rules as the matching list views.
+    """
+    if doc_type == "news":
+        if user.has_perm("api.view_news"):
+            return News.objects.all()
+        return News.objects.none()
+    if doc_type == "note":
+        if user.has_perm("api.view_note"):
+            return Note.permitted(user, "view")
+        return Note.objects.none()
+    if user.has_perm("api.view_message"):
+        return Message.objects.filter(models.Q(sender=user) | models.Q(receiver=user))
+    return Message.objects.none()
+
+
+def search(user, query, doc_types, limit=20):
+    """
+    Returns up to limit documents of each requested type matching query
+    that the user is allowed to see, best match first.
+
+    Returns:
+        dict: {doc_type: [model instances]}
+    """
+    backend = get_backend()
+    results = {}
+
+    for doc_type in doc_types:
+        ids = backend.match(doc_type, query, visible_documents(user, doc_type), limit)
+        objects = DOCUMENTS[doc_type].model.objects.in_bulk(ids)
+        results[doc_type] = [objects[doc_id] for doc_id in ids if doc_id in objects]
+
+    return results
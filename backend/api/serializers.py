@@ -1,11 +1,24 @@
+from collections import Counter
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .authentication import add_auth_claims
+from .hashers import hash_passwords, hashing_slot
 from .models import (
     Note,
     News,
+    NewsType,
     Animal,
     VolunteerProfile,
     UserStatus,
+    AnimalStatus,
     TaxonomicRank,
     Message,
     Donation,
@@ -26,6 +39,10 @@ class UserBasicSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email", "roles", "date_joined"]
 
     def get_roles(self, obj):
+        # Views that already joined the role names onto the user set role_names
+        # so serializing them doesn't cost another query
+        if hasattr(obj, "role_names"):
+            return obj.role_names
         return [group.name for group in obj.groups.all()]
 
 
@@ -37,6 +54,69 @@ class VolunteerProfileSerializer(serializers.ModelSerializer):
         fields = ["user", "bio", "hobbies", "town", "image_url", "status"]
 
 
+class UserListSerializer(serializers.ListSerializer):
+    """
+    Creates many users at once for onboarding a cohort.
+
+    The passwords are hashed in parallel by hash_passwords(). The users,
+    their volunteer profiles and their group memberships are then inserted
+    with one bulk insert each, all in a single transaction. Pass the groups
+    every user joins as save(groups=[...]).
+    """
+
+    def to_internal_value(self, data):
+        attrs = super().to_internal_value(data)
+
+        # The unique validators only check against the database
+        counts = Counter(item["username"] for item in attrs)
+        errors = [
+            {"username": ["This username is listed more than once."]}
+            if counts[item["username"]] > 1
+            else {}
+            for item in attrs
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        passwords = hash_passwords([item["password"] for item in validated_data])
+
+        users = []
+        profiles = []
+        for item, password in zip(validated_data, passwords):
+            users.append(
+                User(
+                    username=User.normalize_username(item["username"]),
+                    email=User.objects.normalize_email(item["email"]),
+                    password=password,
+                )
+            )
+            profiles.append(
+                {
+                    "bio": item["bio"],
+                    "hobbies": item["hobbies"],
+                    "town": item["town"],
+                    "image_url": item.get("image_url"),
+                    "status": item["status"],
+                }
+            )
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(users)
+            VolunteerProfile.objects.bulk_create(
+                VolunteerProfile(user=user, **fields)
+                for user, fields in zip(users, profiles)
+            )
+            Membership = User.groups.through
+            Membership.objects.bulk_create(
+                Membership(user_id=user.pk, group_id=group.pk)
+                for user, item in zip(users, validated_data)
+                for group in item.get("groups", [])
+            )
+        return users
+
+
 class UserSerializer(serializers.ModelSerializer):
     # Nested profile data
     bio = serializers.CharField(write_only=True)
@@ -47,6 +127,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
+        list_serializer_class = UserListSerializer
         fields = [
             "id",
             "username",
@@ -72,7 +153,8 @@ class UserSerializer(serializers.ModelSerializer):
             "status": validated_data.pop("status", UserStatus.ACTIVE),
         }
 
-        user = User.objects.create_user(**validated_data)
+        with hashing_slot():
+            user = User.objects.create_user(**validated_data)
 
         VolunteerProfile.objects.create(user=user, **profile_fields)
         return user
@@ -95,6 +177,28 @@ class NewsSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "content", "date_posted", "type", "animal", "author"]
 
 
+class NewsFilterSerializer(serializers.Serializer):
+    """Validates the news feed filters."""
+
+    type = serializers.ChoiceField(choices=NewsType.choices, required=False)
+    animal = serializers.IntegerField(required=False)
+
+
+class PublicNewsFilterSerializer(serializers.Serializer):
+    """Validates the public news feed filters."""
+
+    type = serializers.ChoiceField(choices=NewsType.choices, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class PublicNewsSerializer(serializers.ModelSerializer):
+    """News as shown on the public site, without staff details."""
+
+    class Meta:
+        model = News
+        fields = ["id", "title", "content", "date_posted", "type", "animal"]
+
+
 class TaxonomicRankSerializer(serializers.ModelSerializer):
     class Meta:
         model = TaxonomicRank
@@ -110,11 +214,112 @@ class TaxonomicRankSerializer(serializers.ModelSerializer):
         ]
 
 
+class AnimalListSerializer(serializers.ListSerializer):
+    """
+    Creates many animals at once for bulk intake.
+
+    Each distinct taxonomic path is validated against the hierarchy once,
+    the TaxonomicRank rows for all of them are resolved with one query and
+    created with one bulk insert if missing, and the animals are inserted
+    with one bulk_create, all in a single transaction.
+    """
+
+    def to_internal_value(self, data):
+        # Load every caregiver with one query instead of one per animal
+        if isinstance(data, list):
+            caregiver_ids = set()
+            for item in data:
+                caregiver = item.get("caregiver") if isinstance(item, dict) else None
+                if not isinstance(caregiver, bool):
+                    try:
+                        caregiver_ids.add(int(caregiver))
+                    except (TypeError, ValueError):
+                        pass
+            self.child.preloaded = {"caregiver": User.objects.in_bulk(caregiver_ids)}
+
+        attrs = super().to_internal_value(data)
+
+        # Raised here rather than in validate() so the errors keep the same
+        # one-entry-per-animal list shape as the field errors
+        path_errors = {}
+        errors = []
+        for item in attrs:
+            path = _taxonomic_path(item["type"])
+            if path not in path_errors:
+                try:
+                    TaxonomicRank.validate_hierarchy(item["type"])
+                    path_errors[path] = None
+                except DjangoValidationError as e:
+                    path_errors[path] = {"type": e.messages}
+            errors.append(path_errors[path] or {})
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        paths = {_taxonomic_path(item["type"]) for item in validated_data}
+        fields = TaxonomicRank.RANK_FIELDS + ["species"]
+
+        with transaction.atomic():
+            ranks = {}
+            lookup = Q()
+            for path in paths:
+                lookup |= Q(**dict(zip(fields, path)))
+            for rank in TaxonomicRank.objects.filter(lookup).order_by("id"):
+                ranks.setdefault(_taxonomic_path(rank.__dict__), rank)
+
+            # Paths were already validated above, so skip TaxonomicRank.save()
+            missing = [
+                TaxonomicRank(**dict(zip(fields, path)))
+                for path in paths
+                if path not in ranks
+            ]
+            for rank in TaxonomicRank.objects.bulk_create(missing):
+                ranks[_taxonomic_path(rank.__dict__)] = rank
+
+            animals = []
+            for item in validated_data:
+                item = dict(item)
+                rank = ranks[_taxonomic_path(item.pop("type"))]
+                animals.append(Animal(type=rank, **item))
+            return Animal.objects.bulk_create(animals)
+
+
+def _taxonomic_path(ranks):
+    """Returns the ranks and species of a taxonomic type as a hashable tuple."""
+    return tuple(ranks[field] for field in TaxonomicRank.RANK_FIELDS + ["species"])
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that looks instances up in the parent serializer's
+    preloaded[field_name] dict ({pk: instance}) when a list serializer has
+    filled it, so validating many items doesn't cost a query per item.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = getattr(self.parent, "preloaded", {}).get(self.field_name)
+        if preloaded is None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            return super().to_internal_value(data)
+        if pk not in preloaded:
+            self.fail("does_not_exist", pk_value=data)
+        return preloaded[pk]
+
+
 class AnimalSerializer(serializers.ModelSerializer):
     type = TaxonomicRankSerializer()
+    caregiver = PreloadedPrimaryKeyRelatedField(
+        queryset=User.objects.all(), allow_null=True, required=False
+    )
 
     class Meta:
         model = Animal
+        list_serializer_class = AnimalListSerializer
         fields = [
             "id",
             "name",
@@ -139,6 +344,54 @@ class AnimalSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class PublicAnimalSerializer(serializers.ModelSerializer):
+    """Animals as shown on the public site, without caregiver details."""
+
+    type = TaxonomicRankSerializer(read_only=True)
+
+    class Meta:
+        model = Animal
+        fields = ["id", "name", "type", "date_added"]
+
+
+class AnimalFilterSerializer(serializers.Serializer):
+    """Validates the animal list filters shared by the list and bulk views."""
+
+    status = serializers.ChoiceField(choices=AnimalStatus.choices, required=False)
+    needs_review = serializers.BooleanField(required=False)
+    caregiver = serializers.IntegerField(required=False, allow_null=True)
+
+
+class AnimalBulkUpdateSerializer(serializers.Serializer):
+    """
+    Validates a bulk animal update: the animals to change, chosen by an ID
+    list or a filter, and the new values to set on all of them.
+    """
+
+    UPDATE_FIELDS = ["status", "needs_review", "caregiver"]
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    filter = AnimalFilterSerializer(required=False)
+    status = serializers.ChoiceField(choices=AnimalStatus.choices, required=False)
+    needs_review = serializers.BooleanField(required=False)
+    caregiver = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(), required=False, allow_null=True
+    )
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide exactly one of ids or filter.")
+        if "filter" in attrs and not attrs["filter"]:
+            raise serializers.ValidationError("filter must not be empty.")
+        if not any(field in attrs for field in self.UPDATE_FIELDS):
+            raise serializers.ValidationError(
+                f"Provide at least one of {self.UPDATE_FIELDS} to update."
+            )
+        return attrs
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender = serializers.ReadOnlyField(source="sender.username")
     receiver = UserBasicSerializer()
@@ -161,3 +414,50 @@ class ExpensesSerializer(serializers.ModelSerializer):
         model = Expenses
         fields = ["id", "usd_amount", "timestamp"]
         extra_kwargs = {"timestamp": {"read_only": True}}
+
+
+class DonationImportSerializer(serializers.ModelSerializer):
+    """Validates one row of a bulk donation import."""
+
+    class Meta:
+        model = Donation
+        fields = ["donor_name", "usd_amount", "timestamp"]
+        extra_kwargs = {"timestamp": {"required": False}}
+
+
+class ExpensesImportSerializer(serializers.ModelSerializer):
+    """Validates one row of a bulk expense import."""
+
+    class Meta:
+        model = Expenses
+        fields = ["usd_amount", "timestamp"]
+        extra_kwargs = {"timestamp": {"required": False}}
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues token pairs whose access token carries the auth claims."""
+
+    def validate(self, attrs):
+        # Authenticating hashes the password, and rehashes it if the
+        # configured hasher or cost changed
+        with hashing_slot():
+            data = super().validate(attrs)
+        refresh = self.token_class(data["refresh"])
+        data["access"] = str(add_auth_claims(refresh.access_token, self.user))
+        return data
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Issues access tokens with freshly loaded auth claims, so refreshing picks
+    up role changes.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        refresh = self.token_class(data.get("refresh", attrs["refresh"]))
+        user = User.objects.prefetch_related("groups").get(
+            pk=refresh[jwt_settings.USER_ID_CLAIM]
+        )
+        data["access"] = str(add_auth_claims(refresh.access_token, user))
+        return data
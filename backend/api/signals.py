@@ -0,0 +1,130 @@
+import time
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .authentication import forget_auth_state
+from .models import Animal, Donation, Expenses, Message, News, Note, VolunteerProfile
+from .search import DOCUMENT_TYPES, get_backend
+
+
+def _table_version_key(model):
+    return f"table-version:{model._meta.label_lower}"
+
+
+def get_table_versions(*models):
+    """
+    Returns the version of each model's table, in the order given.
+
+    A version is the UNIX time of the last change to the table, kept in the
+    Django cache so every worker sees the same value with one lookup.
+    Cached responses and ETags built from it go stale as soon as a row
+    changes, without re-running the query behind them.
+    Versions that were evicted or expired restart at the current time
+    rather than at zero. An old ETag can therefore never match again; the
+    cost is one cache miss. With a per-process cache, versions expire after
+    settings.TABLE_VERSION_TIMEOUT seconds, so a worker that didn't handle
+    a write serves stale data for at most that long.
+    """
+    keys = [_table_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, settings.TABLE_VERSION_TIMEOUT)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def get_table_version(model):
+    """Returns the version of one model's table, see get_table_versions."""
+    return get_table_versions(model)[0]
+
+
+@receiver(post_save, sender=Animal)
+@receiver(post_delete, sender=Animal)
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+@receiver(post_save, sender=Donation)
+@receiver(post_delete, sender=Donation)
+@receiver(post_save, sender=Expenses)
+@receiver(post_delete, sender=Expenses)
+@receiver(post_save, sender=VolunteerProfile)
+@receiver(post_delete, sender=VolunteerProfile)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def bump_table_version(sender, **kwargs):
+    """
+    Marks a table as changed.
+
+    Queryset update(), delete() and bulk_create() don't send signals, so code
+    using them must call this itself with the model as sender.
+    """
+    cache.set(
+        _table_version_key(sender), time.time(), settings.TABLE_VERSION_TIMEOUT
+    )
+
+
+@receiver(post_save, sender=User)
+def bump_user_version(sender, update_fields=None, **kwargs):
+    # Every login saves last_login, which nothing versioned displays
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    bump_table_version(User)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def bump_user_roles_version(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_table_version(User)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def bump_group_permissions_version(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_table_version(Group)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user_auth_state(sender, instance, update_fields=None, **kwargs):
+    """Makes this worker reload a changed user's roles and permissions."""
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    forget_auth_state(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def forget_user_permissions_auth_state(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    # Reverse changes (group.user_set.add(...)) may affect many users
+    forget_auth_state(None if reverse else instance.pk)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(post_delete, sender=Group)
+def forget_group_auth_state(sender, **kwargs):
+    forget_auth_state()
+
+
+@receiver(post_save, sender=News)
+@receiver(post_save, sender=Note)
+@receiver(post_save, sender=Message)
+def index_search_document(sender, instance, **kwargs):
+    """Adds a saved news item, note or message to the search index."""
+    get_backend().index(DOCUMENT_TYPES[sender], instance)
+
+
+@receiver(post_delete, sender=News)
+@receiver(post_delete, sender=Note)
+@receiver(post_delete, sender=Message)
+def remove_search_document(sender, instance, **kwargs):
+    """Removes a deleted news item, note or message from the search index."""
+    get_backend().remove(DOCUMENT_TYPES[sender], instance.pk)
@@ -1,3 +1,1037 @@
-from django.test import TestCase
+import gzip
+import json
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from . import hashers
+from .db_routers import PrimaryReplicaRouter, _use_replica
+from .models import (
+    Animal,
+    Donation,
+    Expenses,
+    FundLedger,
+    FundMonthlyRollup,
+    Message,
+    News,
+    Note,
+    TaxonomicRank,
+    VolunteerProfile,
+)
+from .search import DatabaseLikeBackend, SQLiteFTSBackend, visible_documents
+from .signals import bump_table_version
 
-# Create your tests here.
+PASSWORD = "pw-12345!"
+
+
+def make_user(username, role, **profile):
+    """Creates a user with a volunteer profile in the given role group."""
+    user = User.objects.create_user(
+        username=username, email=f"{username}@example.org", password=PASSWORD
+    )
+    user.groups.add(Group.objects.get(name=role))
+    VolunteerProfile.objects.create(user=user, town=profile.get("town", "Reno"))
+    return user
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class RolesTestCase(TestCase):
+    """Test case with the roles from `manage.py create_roles`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("create_roles", verbosity=0)
+
+
+class CreateRolesTests(TestCase):
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("create_roles", *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_check_reports_drift_until_synced(self):
+        self.run_command()
+        self.assertIn("Roles match the spec.", self.run_command("--check"))
+
+        hr = Group.objects.get(name="hr")
+        hr.permissions.remove(Permission.objects.get(codename="hr_view_note"))
+        hr.permissions.add(Permission.objects.get(codename="delete_expenses"))
+
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, "1 role(s) differ"):
+            call_command("create_roles", "--check", stdout=out)
+        self.assertIn("hr: +1 -1", out.getvalue())
+        self.assertIn("+ api.hr_view_note", out.getvalue())
+        self.assertIn("- api.delete_expenses", out.getvalue())
+        # --check changed nothing
+        self.assertFalse(hr.permissions.filter(codename="hr_view_note").exists())
+
+        self.assertIn("hr: +1 -1", self.run_command())
+        self.assertIn("Roles match the spec.", self.run_command("--check"))
+
+    def test_second_run_writes_nothing(self):
+        self.run_command()
+        Grant = Group.permissions.through
+        grants = set(Grant.objects.values_list("pk", flat=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            out = self.run_command()
+
+        self.assertIn("Roles are up to date.", out)
+        self.assertLessEqual(len(queries), 3)
+        self.assertFalse(
+            [query for query in queries if not query["sql"].startswith("SELECT")]
+        )
+        self.assertEqual(set(Grant.objects.values_list("pk", flat=True)), grants)
+
+
+class VolunteerProfileListTests(RolesTestCase):
+    def test_search_matches_role_names(self):
+        hr = make_user("hana", "hr")
+        make_user("carl", "caregiver")
+        make_user("vera", "volunteer")
+
+        response = client_for(hr).get(
+            "/api/volunteer-profiles/", {"search": "caregiver"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        names = [profile["user"]["username"] for profile in response.data["results"]]
+        self.assertEqual(names, ["carl"])
+
+
+class FundLedgerTests(TestCase):
+    def assertLedgerInSync(self):
+        ledger = FundLedger.objects.get(pk=FundLedger.LEDGER_ID)
+        self.assertEqual(
+            (ledger.total_donations, ledger.total_expenses),
+            FundLedger.compute_totals(),
+        )
+        # Raises CommandError if the ledger or a monthly rollup drifted
+        call_command("rebuild_fund_ledger", "--check", stdout=StringIO())
+
+    def test_writes_keep_the_totals_in_sync(self):
+        first = Donation.objects.create(donor_name="Ada", usd_amount=100)
+        Donation.objects.create(
+            donor_name="Bob",
+            usd_amount=40,
+            timestamp=timezone.now() - timedelta(days=62),
+        )
+        expense = Expenses.objects.create(usd_amount=30)
+        self.assertLedgerInSync()
+
+        first.usd_amount = 250
+        first.save()
+        expense.delete()
+        self.assertLedgerInSync()
+        self.assertEqual(FundLedger.current().available_funds, 290)
+
+    def test_moving_an_entry_to_another_month(self):
+        donation = Donation.objects.create(donor_name="Ada", usd_amount=100)
+        expense = Expenses.objects.create(usd_amount=30)
+
+        donation.timestamp -= timedelta(days=62)
+        donation.usd_amount = 120
+        donation.save()
+        expense.timestamp += timedelta(days=62)
+        expense.save()
+
+        self.assertLedgerInSync()
+        rollups = FundMonthlyRollup.objects.filter(
+            month=FundMonthlyRollup.month_of(timezone.now())
+        ).values("donations_total", "donations_count", "expenses_count")
+        self.assertEqual(
+            list(rollups),
+            [{"donations_total": 0, "donations_count": 0, "expenses_count": 0}],
+        )
+
+    def test_batches_keep_the_totals_in_sync(self):
+        with transaction.atomic():
+            donations = Donation.objects.bulk_create(
+                Donation(donor_name=f"donor {i}", usd_amount=i) for i in range(1, 11)
+            )
+            Donation.record_batch(donations)
+        self.assertLedgerInSync()
+
+    def test_check_reports_drift_and_rebuild_repairs_it(self):
+        Donation.objects.create(donor_name="Ada", usd_amount=100)
+        FundLedger.objects.update(total_donations=1)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_fund_ledger", "--check", stdout=StringIO())
+        call_command("rebuild_fund_ledger", stdout=StringIO())
+        self.assertLedgerInSync()
+
+
+class DonationListTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for days in (0, 40, 400):
+            Donation.objects.create(
+                donor_name=f"{days} days ago",
+                usd_amount=1,
+                timestamp=now - timedelta(days=days),
+            )
+        self.client = APIClient()
+
+    def names(self, **params):
+        response = self.client.get("/api/donations/", params)
+        self.assertEqual(response.status_code, 200)
+        return [donation["donor_name"] for donation in response.data["results"]]
+
+    def test_range_parameters(self):
+        today = timezone.localdate()
+        old = (today - timedelta(days=400)).isoformat()
+        self.assertEqual(self.names(), ["0 days ago"])
+        self.assertEqual(self.names(months=3), ["0 days ago", "40 days ago"])
+        self.assertEqual(
+            self.names(**{"from": old}),
+            ["0 days ago", "40 days ago", "400 days ago"],
+        )
+        # Without from, to has no lower bound
+        self.assertEqual(
+            self.names(to=(today - timedelta(days=30)).isoformat()),
+            ["40 days ago", "400 days ago"],
+        )
+        self.assertEqual(self.names(**{"from": old, "to": old}), ["400 days ago"])
+
+    def test_invalid_range_parameters(self):
+        for params in ({"from": "2026-13-01"}, {"to": "yesterday"}, {"months": 0}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/donations/", params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pages_are_newest_first(self):
+        timestamp = timezone.now() - timedelta(days=500)
+        Donation.objects.bulk_create(
+            # Several rows share a timestamp, which pages must not skip
+            Donation(donor_name=f"batch {i}", usd_amount=1, timestamp=timestamp)
+            for i in range(5)
+        )
+        seen = []
+        url = "/api/donations/?from=2000-01-01&page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(len(seen), 8)
+        self.assertEqual(len({donation["id"] for donation in seen}), 8)
+        timestamps = [donation["timestamp"] for donation in seen]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+
+class FundImportTests(RolesTestCase):
+    def upload(self, content):
+        ceo = make_user("cleo", "ceo")
+        upload = SimpleUploadedFile("donations.csv", content, content_type="text/csv")
+        return client_for(ceo).post(
+            "/api/donations/import/", {"file": upload}, format="multipart"
+        )
+
+    def test_imports_every_batch(self):
+        rows = [f"donor {i},{i}".encode() for i in range(1, 1501)]
+        response = self.upload(b"\n".join([b"donor_name,usd_amount"] + rows))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 1500)
+        self.assertEqual(FundLedger.current().total_donations, 1500 * 1501 // 2)
+
+    def test_rejects_bad_encoding_before_writing_anything(self):
+        # The bad byte comes after the first batch of 1000 rows
+        rows = [f"donor {i},{i}".encode() for i in range(1, 1501)]
+        rows[1200] = b"donor \xff,5"
+        response = self.upload(b"\n".join([b"donor_name,usd_amount"] + rows))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line 1202", response.data["error"])
+        self.assertFalse(Donation.objects.exists())
+
+    def test_command_rejects_bad_encoding_before_writing_anything(self):
+        rows = [f"donor {i},{i}".encode() for i in range(1, 1501)]
+        rows[1200] = b"donor \xff,5"
+        content = b"\n".join([b"donor_name,usd_amount"] + rows)
+        offset = content.index(b"\xff")
+        with tempfile.NamedTemporaryFile(suffix=".csv") as export:
+            export.write(content)
+            export.flush()
+
+            with self.assertRaisesMessage(
+                CommandError, f"line 1202 is not (byte {offset})"
+            ):
+                call_command("import_funds", "donations", export.name)
+        self.assertFalse(Donation.objects.exists())
+
+
+class ExportTests(RolesTestCase):
+    def setUp(self):
+        self.ceo = make_user("cleo", "ceo")
+        self.volunteer = make_user("vera", "volunteer")
+        Expenses.objects.bulk_create(Expenses(usd_amount=i) for i in range(1, 51))
+
+    def download(self, response):
+        self.assertEqual(response.status_code, 200)
+        chunks = list(response.streaming_content)
+        return chunks, b"".join(chunks)
+
+    def test_csv_header_and_rows(self):
+        response = client_for(self.ceo).get("/api/expenses/export/")
+        _, content = self.download(response)
+
+        lines = content.decode().splitlines()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(lines[0], "id,usd_amount,timestamp")
+        self.assertEqual(len(lines), 51)
+        self.assertEqual(
+            sorted(int(line.split(",")[1]) for line in lines[1:]), list(range(1, 51))
+        )
+
+    def test_permissions_match_the_list_endpoints(self):
+        for user in (self.ceo, self.volunteer):
+            client = client_for(user)
+            for url in ("/api/expenses/", "/api/animals/", "/api/volunteer-profiles/"):
+                with self.subTest(user=user.username, url=url):
+                    listed = client.get(url)
+                    exported = client.get(f"{url}export/")
+                    self.assertEqual(exported.status_code, listed.status_code)
+
+        # Exports are whole tables, so even donations, whose list is public,
+        # need the view permission
+        self.assertEqual(APIClient().get("/api/donations/export/").status_code, 401)
+        response = client_for(self.volunteer).get("/api/donations/export/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_gzip_download(self):
+        response = client_for(self.ceo).get(
+            "/api/expenses/export/", {"output_format": "jsonl", "gzip": "true"}
+        )
+        _, content = self.download(response)
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        # A .gz file to save, not a transfer encoding the client would undo
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="expenses.jsonl.gz"'
+        )
+        lines = gzip.decompress(content).decode().splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertEqual(set(json.loads(lines[0])), {"id", "usd_amount", "timestamp"})
+
+    @mock.patch("api.exports.CHUNK_SIZE", 7)
+    @mock.patch("api.exports.FLUSH_SIZE", 256)
+    def test_streams_in_several_chunks(self):
+        for compress in ("false", "true"):
+            with self.subTest(gzip=compress):
+                response = client_for(self.ceo).get(
+                    "/api/expenses/export/", {"gzip": compress}
+                )
+                chunks, content = self.download(response)
+                if compress == "true":
+                    content = gzip.decompress(content)
+
+                self.assertGreater(len(chunks), 1)
+                self.assertEqual(len(content.decode().splitlines()), 51)
+
+
+WOLF = {
+    "domain": "Eukaryota",
+    "kingdom": "Animalia",
+    "phylum": "Chordata",
+    "class_field": "Mammalia",
+    "order": "Carnivora",
+    "family": "Canidae",
+    "genus": "Canis",
+    "species": "lupus",
+}
+
+
+class UserBulkCreateTests(RolesTestCase):
+    def setUp(self):
+        self.client = client_for(make_user("hana", "hr"))
+
+    def cohort(self, *usernames):
+        return [
+            {
+                "username": username,
+                "email": f"{username}@example.org",
+                "password": f"{username}-pw-123!",
+                "bio": "New volunteer",
+                "hobbies": "Hiking",
+                "town": "Reno",
+            }
+            for username in usernames
+        ]
+
+    def create(self, users):
+        return self.client.post("/api/users/bulk/", users, format="json")
+
+    def test_creates_volunteers_with_working_passwords(self):
+        response = self.create(self.cohort("ann", "ben", "cat"))
+
+        self.assertEqual(response.status_code, 201)
+        for username in ("ann", "ben", "cat"):
+            user = User.objects.get(username=username)
+            self.assertTrue(check_password(f"{username}-pw-123!", user.password))
+            self.assertEqual(
+                list(user.groups.values_list("name", flat=True)), ["volunteer"]
+            )
+            self.assertTrue(VolunteerProfile.objects.filter(user=user).exists())
+        login = APIClient().post(
+            "/api/token/",
+            {"username": "ben", "password": "ben-pw-123!"},
+            format="json",
+        )
+        self.assertEqual(login.status_code, 200)
+
+    def test_duplicate_in_the_batch_creates_nobody(self):
+        response = self.create(self.cohort("ann", "ben", "ann"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("username", response.data[2])
+        self.assertFalse(User.objects.filter(username__in=["ann", "ben"]).exists())
+
+    def test_existing_username_creates_nobody(self):
+        response = self.create(self.cohort("ann", "hana", "ben"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("username", response.data[1])
+        self.assertFalse(User.objects.filter(username__in=["ann", "ben"]).exists())
+
+    def test_failed_insert_creates_nobody(self):
+        with mock.patch.object(
+            VolunteerProfile.objects, "bulk_create", side_effect=IntegrityError
+        ):
+            with self.assertRaises(IntegrityError):
+                self.create(self.cohort("ann", "ben"))
+
+        self.assertFalse(User.objects.filter(username__in=["ann", "ben"]).exists())
+
+    def test_needs_the_add_user_permission(self):
+        volunteer = client_for(make_user("vera", "volunteer"))
+
+        response = volunteer.post("/api/users/bulk/", self.cohort("ann"), format="json")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(username="ann").exists())
+
+
+class AnimalBulkCreateTests(RolesTestCase):
+    def setUp(self):
+        self.client = client_for(make_user("cleo", "ceo"))
+        self.caregivers = [make_user(f"carer{i}", "caregiver") for i in range(8)]
+
+    def animals(self, count):
+        return [
+            {"name": f"wolf {i}", "type": WOLF, "caregiver": carer.pk}
+            for i, carer in enumerate(self.caregivers[:count])
+        ]
+
+    def test_caregivers_are_loaded_with_one_query(self):
+        # Warm up the permission and taxonomy lookups
+        self.client.post("/api/animals/bulk/", self.animals(1), format="json")
+
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.post(
+                "/api/animals/bulk/", self.animals(2), format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.post(
+                "/api/animals/bulk/", self.animals(8), format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(
+            sorted(animal["caregiver"] for animal in response.data),
+            sorted(carer.pk for carer in self.caregivers),
+        )
+
+    def test_unknown_caregiver_is_reported_per_animal(self):
+        animals = self.animals(2)
+        animals[1]["caregiver"] = 999999
+
+        response = self.client.post("/api/animals/bulk/", animals, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("caregiver", response.data[1])
+        self.assertFalse(Animal.objects.exists())
+
+
+class AnimalListTests(RolesTestCase):
+    def setUp(self):
+        rank = TaxonomicRank.objects.create(**WOLF)
+        Animal.objects.create(name="checked", type=rank, needs_review=False)
+        Animal.objects.create(name="waiting", type=rank, needs_review=True)
+        self.client = client_for(make_user("cleo", "ceo"))
+
+    def names(self, params=None):
+        response = self.client.get("/api/animals/", params or {})
+        self.assertEqual(response.status_code, 200)
+        return sorted(animal["name"] for animal in response.data)
+
+    def test_unfiltered_list_includes_animals_needing_review(self):
+        self.assertEqual(self.names(), ["checked", "waiting"])
+
+    def test_needs_review_filter(self):
+        self.assertEqual(self.names({"needs_review": "true"}), ["waiting"])
+        self.assertEqual(self.names({"needs_review": "false"}), ["checked"])
+
+
+class CaregiverViewsTests(RolesTestCase):
+    def setUp(self):
+        rank = TaxonomicRank.objects.create(**WOLF)
+        self.carer = make_user("carl", "caregiver")
+        make_user("cora", "caregiver")
+        for status in ("healthy", "sick", "sick"):
+            Animal.objects.create(
+                name=status, type=rank, status=status, caregiver=self.carer
+            )
+        Animal.objects.create(name="stray", type=rank)
+
+    def test_my_animals_with_counts(self):
+        response = client_for(self.carer).get("/api/animals/mine/", {"status": "sick"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["counts"], {"healthy": 1, "sick": 2, "adopted": 0}
+        )
+        self.assertEqual([a["name"] for a in response.data["results"]], ["sick"] * 2)
+
+    def test_unknown_status_is_rejected(self):
+        response = client_for(self.carer).get("/api/animals/mine/", {"status": "lost"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.data)
+
+    def test_workload_needs_the_permission(self):
+        for role, status in [
+            ("head caregiver", 200),
+            ("board", 200),
+            ("ceo", 200),
+            ("caregiver", 403),
+            ("hr", 403),
+            ("volunteer", 403),
+        ]:
+            with self.subTest(role=role):
+                user = make_user(f"user {role}", role)
+                response = client_for(user).get("/api/animals/workload/")
+                self.assertEqual(response.status_code, status)
+
+    def test_workload_counts(self):
+        head = make_user("hugo", "head caregiver")
+
+        response = client_for(head).get("/api/animals/workload/")
+
+        workloads = {row["username"]: row for row in response.data}
+        self.assertEqual(
+            {name: row["total"] for name, row in workloads.items()},
+            {"carl": 3, "cora": 0, "hugo": 0, None: 1},
+        )
+        self.assertEqual(workloads["carl"]["by_status"]["sick"], 2)
+        self.assertEqual(response.data[0]["username"], "carl")
+
+
+class AnimalBulkUpdateTests(RolesTestCase):
+    def setUp(self):
+        rank = TaxonomicRank.objects.create(**WOLF)
+        self.animals = [
+            Animal.objects.create(name=f"wolf {i}", type=rank) for i in range(3)
+        ]
+        self.ids = [animal.pk for animal in self.animals]
+        self.client = client_for(make_user("hugo", "head caregiver"))
+
+    def update(self, data, client=None):
+        return (client or self.client).patch(
+            "/api/animals/bulk-update/", data, format="json"
+        )
+
+    def statuses(self):
+        return list(Animal.objects.order_by("pk").values_list("status", flat=True))
+
+    def test_updates_the_batch_and_bumps_the_version_once(self):
+        with mock.patch("api.views.bump_table_version") as bump:
+            response = self.update({"ids": self.ids, "status": "sick"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"updated": 3})
+        self.assertEqual(self.statuses(), ["sick"] * 3)
+        bump.assert_called_once_with(sender=Animal)
+
+    def test_filter_updates_every_match(self):
+        Animal.objects.filter(pk=self.ids[0]).update(needs_review=False)
+        with mock.patch("api.views.bump_table_version") as bump:
+            response = self.update(
+                {"filter": {"needs_review": True}, "status": "adopted"}
+            )
+
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual(self.statuses(), ["healthy", "adopted", "adopted"])
+        bump.assert_called_once_with(sender=Animal)
+
+    def test_unknown_id_rejects_the_whole_batch(self):
+        with mock.patch("api.views.bump_table_version") as bump:
+            response = self.update({"ids": self.ids + [999999], "status": "sick"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("999999", str(response.data["ids"]))
+        self.assertEqual(self.statuses(), ["healthy"] * 3)
+        bump.assert_not_called()
+
+    def test_invalid_value_rejects_the_whole_batch(self):
+        response = self.update({"ids": self.ids, "status": "sick", "caregiver": 999999})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.statuses(), ["healthy"] * 3)
+
+    def test_needs_the_change_permission(self):
+        # HR may view animals but not change them
+        hr = client_for(make_user("hana", "hr"))
+
+        response = self.update({"ids": self.ids, "status": "sick"}, client=hr)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.statuses(), ["healthy"] * 3)
+
+
+class SearchTests(RolesTestCase):
+    def setUp(self):
+        self.ceo = make_user("cleo", "ceo")
+        self.hr = make_user("hana", "hr")
+        self.volunteer = make_user("vera", "volunteer")
+
+    def search(self, user, **params):
+        response = client_for(user).get("/api/search/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_messages_of_others_are_filtered_in_the_query(self):
+        Message.objects.bulk_create(
+            Message(sender=self.ceo, receiver=self.hr, subject="Adoption", body="x")
+            for _ in range(300)
+        )
+        call_command("rebuild_search_index", stdout=StringIO())
+        own = Message.objects.create(
+            sender=self.ceo, receiver=self.volunteer, subject="Adoption", body="x"
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.search(self.volunteer, q="adoption", types="message")
+
+        self.assertEqual([message["id"] for message in data["message"]], [own.pk])
+        self.assertLess(len(queries), 10)
+
+    def test_notes_follow_board_permissions(self):
+        Note.objects.create(title="Budget", content="a", author=self.ceo, boards=["ceo"])
+        Note.objects.create(title="Budget", content="b", author=self.ceo, boards=["hr"])
+        Note.objects.create(title="Budget", content="c", author=self.ceo, boards=[])
+
+        def contents(user):
+            data = self.search(user, q="budget", types="note")
+            return sorted(note["content"] for note in data["note"])
+
+        self.assertEqual(contents(self.ceo), ["a", "b", "c"])
+        self.assertEqual(contents(self.hr), ["b", "c"])
+        self.assertEqual(contents(self.volunteer), ["c"])
+
+    def test_notes_need_the_view_permission(self):
+        Note.objects.create(title="Budget", content="a", author=self.ceo, boards=["hr"])
+        # A board permission alone doesn't open the note list
+        user = User.objects.create_user("bo")
+        user.user_permissions.add(Permission.objects.get(codename="hr_view_note"))
+        self.assertEqual(client_for(user).get("/api/notes/").status_code, 403)
+
+        self.assertEqual(self.search(user, q="budget", types="note")["note"], [])
+        for backend in (SQLiteFTSBackend(), DatabaseLikeBackend()):
+            with self.subTest(backend=type(backend).__name__):
+                ids = backend.match(
+                    "note", "budget", visible_documents(user, "note"), 20
+                )
+                self.assertEqual(ids, [])
+
+    def test_like_backend_applies_the_same_filter(self):
+        Message.objects.create(
+            sender=self.ceo, receiver=self.hr, subject="Adoption", body="x"
+        )
+        own = Message.objects.create(
+            sender=self.hr, receiver=self.volunteer, subject="Adoption", body="y"
+        )
+
+        ids = DatabaseLikeBackend().match(
+            "message", "adoption", visible_documents(self.volunteer, "message"), 20
+        )
+        self.assertEqual(ids, [own.pk])
+
+
+class ConditionalListTests(RolesTestCase):
+    def setUp(self):
+        self.ceo = make_user("cleo", "ceo")
+        self.client = client_for(self.ceo)
+
+    def test_unchanged_list_answers_304_until_a_write(self):
+        News.objects.create(title="Open day", content="x", author=self.ceo)
+        etag = self.client.get("/api/news/")["ETag"]
+
+        response = self.client.get("/api/news/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        News.objects.create(title="Fundraiser", content="y", author=self.ceo)
+        response = self.client.get("/api/news/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @override_settings(TABLE_VERSION_TIMEOUT=60)
+    def test_versions_expire_under_a_per_process_cache(self):
+        bump_table_version(News)
+
+        key = f"table-version:{News._meta.label_lower}"
+        self.assertIsNotNone(cache.get(key))
+        with mock.patch("time.time", return_value=time.time() + 61):
+            # Another worker's bump it never saw can only hide this long
+            self.assertIsNone(cache.get(key))
+
+
+class PublicEndpointTests(RolesTestCase):
+    def setUp(self):
+        rank = TaxonomicRank.objects.create(**WOLF)
+        Animal.objects.create(name="Luna", type=rank, needs_review=False)
+        Animal.objects.create(name="unchecked", type=rank, needs_review=True)
+        self.client = APIClient()
+
+    def test_conditional_requests_answer_304(self):
+        first = self.client.get("/api/public/animals/")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Cache-Control"], "public, max-age=60")
+
+        response = self.client.get(
+            "/api/public/animals/", HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            "/api/public/animals/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_a_write_changes_the_validators(self):
+        first = self.client.get("/api/public/animals/")
+
+        # Last-Modified has a resolution of one second
+        with mock.patch("time.time", return_value=time.time() + 5):
+            Animal.objects.filter(name="unchecked").update(needs_review=False)
+            bump_table_version(Animal)
+        response = self.client.get(
+            "/api/public/animals/", HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertNotEqual(response["Last-Modified"], first["Last-Modified"])
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.get(
+            "/api/public/animals/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_logged_in_users_get_the_shared_response(self):
+        ceo = make_user("cleo", "ceo")
+        News.objects.create(title="Open day", content="x", author=ceo)
+        access = APIClient().post(
+            "/api/token/", {"username": "cleo", "password": PASSWORD}, format="json"
+        ).data["access"]
+
+        for url in ("/api/public/animals/", "/api/public/news/"):
+            with self.subTest(url=url):
+                anonymous = self.client.get(url)
+                client = APIClient()
+                client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+                logged_in = client.get(url)
+                client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+                bad_token = client.get(url)
+
+                # Tokens are ignored, so a shared cache may serve one
+                # response to everyone
+                for response in (logged_in, bad_token):
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.data, anonymous.data)
+                    self.assertEqual(response["ETag"], anonymous["ETag"])
+
+        # No staff-only rows or fields even for the CEO
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        animals = client.get("/api/public/animals/").data
+        self.assertEqual([animal["name"] for animal in animals], ["Luna"])
+        self.assertNotIn("author", logged_in.data[0])
+
+        # Staff views of the same tables stay private
+        response = client_for(ceo).get("/api/news/")
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    @mock.patch("api.db_routers.replica_configured", return_value=True)
+    def test_only_api_models_are_read_from_the_replica(self, replica_configured):
+        router = PrimaryReplicaRouter()
+        cache_model = DatabaseCache("django_cache", {}).cache_model_class
+
+        token = _use_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Animal), "replica")
+            self.assertEqual(router.db_for_read(User), "default")
+            self.assertEqual(router.db_for_read(Group), "default")
+            self.assertEqual(router.db_for_read(cache_model), "default")
+        finally:
+            _use_replica.reset(token)
+        self.assertEqual(router.db_for_read(Animal), "default")
+
+
+class NotePermittedTests(RolesTestCase):
+    """
+    Note.permitted() must return exactly the notes the Python rules allow.
+
+    Runs against whichever database the tests use, e.g. for PostgreSQL:
+        DJANGO_DB_PROFILE=postgresql python manage.py test api
+    """
+
+    BOARDS = ["ceo", "hr", "board", "volunteer"]
+    ROLES = ["ceo", "board", "hr", "head caregiver", "caregiver", "volunteer"]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        author = User.objects.create_user("author")
+        # Every combination of boards, plus an unknown one
+        board_sets = [
+            [board for i, board in enumerate(cls.BOARDS) if mask & (1 << i)]
+            for mask in range(1 << len(cls.BOARDS))
+        ] + [["ceo", "unknown"], ["unknown"]]
+        for boards in board_sets:
+            Note.objects.create(title="t", content="c", author=author, boards=boards)
+
+        cls.users = [make_user(role, role) for role in cls.ROLES]
+        cls.users.append(User.objects.create_user("nobody"))
+        cls.users.append(User.objects.create_superuser("root"))
+
+    @staticmethod
+    def allowed(user, action, note):
+        if not note.boards:
+            return user.has_perm(f"api.{action}_note")
+        return Note.check_board_permissions(user, action, note.boards)
+
+    def test_matches_the_python_rules(self):
+        notes = list(Note.objects.all())
+        for user in self.users:
+            for action in ("view", "delete"):
+                with self.subTest(user=user.username, action=action):
+                    user = User.objects.get(pk=user.pk)  # fresh permission cache
+                    expected = {
+                        note.pk for note in notes if self.allowed(user, action, note)
+                    }
+                    actual = set(
+                        Note.permitted(user, action).values_list("pk", flat=True)
+                    )
+                    self.assertEqual(actual, expected)
+
+    def test_works_inside_an_aliased_subquery(self):
+        volunteer = User.objects.get(username="volunteer")
+        visible = Note.permitted(volunteer, "view")
+
+        # The note table gets another alias inside this subquery
+        authors = User.objects.filter(pk__in=visible.values("author"))
+
+        self.assertEqual(list(authors.values_list("username", flat=True)), ["author"])
+
+    @skipUnless(connection.vendor == "postgresql", "Needs PostgreSQL")
+    def test_viewing_uses_the_gin_index(self):
+        volunteer = User.objects.get(username="volunteer")
+        queryset = Note.permitted(volunteer, "view")
+        with connection.cursor() as cursor:
+            # The table is tiny, so make the planner prefer any index
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+
+        self.assertIn("?|", str(queryset.query))
+        self.assertIn("note_boards_gin_idx", plan)
+        self.assertIn("note_no_boards_idx", plan)
+
+
+class ClaimsAuthenticationTests(RolesTestCase):
+    def setUp(self):
+        self.user = make_user("vera", "volunteer")
+        response = APIClient().post(
+            "/api/token/",
+            {"username": "vera", "password": PASSWORD},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.tokens = response.data
+
+    def get_roles(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client.get("/api/user/roles/")
+
+    def test_roles_come_from_the_token(self):
+        # The first request loads and memoizes the user's auth state
+        self.get_roles(self.tokens["access"])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_roles(self.tokens["access"])
+
+        self.assertEqual(response.data["roles"], ["volunteer"])
+        self.assertEqual(len(queries), 0)
+
+    def test_role_change_makes_the_token_stale(self):
+        self.assertEqual(self.get_roles(self.tokens["access"]).status_code, 200)
+
+        self.user.groups.add(Group.objects.get(name="caregiver"))
+
+        response = self.get_roles(self.tokens["access"])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["code"], "token_stale")
+
+        refreshed = APIClient().post(
+            "/api/token/refresh/", {"refresh": self.tokens["refresh"]}, format="json"
+        )
+        response = self.get_roles(refreshed.data["access"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["roles"], ["caregiver", "volunteer"])
+
+    def test_password_change_makes_the_token_stale(self):
+        self.user.set_password("another-pw-987!")
+        self.user.save()
+
+        response = self.get_roles(self.tokens["access"])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["code"], "token_stale")
+
+
+class HashPasswordsTests(SimpleTestCase):
+    @mock.patch.dict(hashers.COST, {"MAX_CONCURRENT": 2, "MAX_WAIT": 1})
+    @mock.patch.object(hashers, "_slots", threading.BoundedSemaphore(2))
+    def test_leaves_a_slot_for_logins(self):
+        free_while_hashing = []
+
+        def make_password(password):
+            # A login arriving now must still get a slot
+            acquired = hashers._slots.acquire(blocking=False)
+            free_while_hashing.append(acquired)
+            if acquired:
+                hashers._slots.release()
+            return f"hashed:{password}"
+
+        with mock.patch.object(hashers, "make_password", make_password):
+            hashed = hashers.hash_passwords(["a", "b", "c"])
+
+        self.assertEqual(hashed, ["hashed:a", "hashed:b", "hashed:c"])
+        self.assertEqual(free_while_hashing, [True, True, True])
+        # Every slot was given back
+        for _ in range(2):
+            self.assertTrue(hashers._slots.acquire(blocking=False))
+
+
+@skipUnless(hashers.fcntl is not None, "Needs flock()")
+class HostSlotsTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.fork = multiprocessing.get_context("fork")
+
+    def test_slots_are_shared_by_every_process(self):
+        slots = hashers.HostSlots(self.directory, 2)
+        held, done = self.fork.Event(), self.fork.Event()
+
+        def hold_one():
+            slots.acquire()
+            held.set()
+            done.wait(10)
+
+        worker = self.fork.Process(target=hold_one)
+        worker.start()
+        try:
+            self.assertTrue(held.wait(10))
+            self.assertTrue(slots.acquire(blocking=False))
+            self.assertFalse(slots.acquire(timeout=0.1))
+        finally:
+            done.set()
+            worker.join(10)
+        # The worker's slot was freed when it exited
+        self.assertTrue(slots.acquire(timeout=1))
+        slots.release()
+        slots.release()
+
+    def test_forked_children_dont_keep_the_parents_slots(self):
+        slots = hashers.HostSlots(self.directory, 1)
+        slots.acquire()
+        child = self.fork.Process(target=time.sleep, args=(10,))
+        child.start()
+        try:
+            slots.release()
+            # Allow for the child to start up and close its copies
+            self.assertTrue(slots.acquire(timeout=2))
+            slots.release()
+        finally:
+            child.terminate()
+            child.join()
+
+
+class PasswordHashingViewTests(RolesTestCase):
+    def setUp(self):
+        self.user = make_user("vera", "volunteer")
+
+    def login(self, password=PASSWORD):
+        return APIClient().post(
+            "/api/token/", {"username": "vera", "password": password}, format="json"
+        )
+
+    def test_login_rehashes_with_the_configured_hasher(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password(PASSWORD, hasher="pbkdf2_sha256")
+        )
+
+        self.assertEqual(self.login().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("scrypt$"))
+        self.assertEqual(self.login().status_code, 200)
+
+    @mock.patch.dict(hashers.COST, {"MAX_WAIT": 0.1})
+    @mock.patch.object(hashers, "_slots", threading.BoundedSemaphore(1))
+    def test_busy_slots_answer_429(self):
+        client = client_for(self.user)
+        old_hash = self.user.password
+        hashers._slots.acquire()
+        try:
+            self.assertEqual(self.login().status_code, 429)
+            response = client.post(
+                "/api/change-password/",
+                {"current_password": PASSWORD, "new_password": "another-pw-987!"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 429)
+        finally:
+            hashers._slots.release()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, old_hash)
+        self.assertEqual(self.login().status_code, 200)
@@ -8,10 +8,28 @@ from .views import (
 urlpatterns = [
     path("notes/", views.NoteListCreate.as_view(), name="note-list"),
     path("notes/<int:pk>/", views.NoteDelete.as_view(), name="note-delete"),
+    path("search/", views.SearchView.as_view(), name="search"),
     path("user/roles/", views.UserRolesView.as_view(), name="user-roles"),
     path("news/", views.NewsListCreate.as_view(), name="news-list"),
+    path("public/news/", views.PublicNewsList.as_view(), name="public-news"),
+    path(
+        "public/animals/", views.PublicAnimalList.as_view(), name="public-animals"
+    ),
     path("news/<int:pk>/", views.NewsDetail.as_view(), name="news-detail"),
     path("animals/", views.AnimalListCreate.as_view(), name="animal-list"),
+    path("animals/bulk/", views.AnimalBulkCreate.as_view(), name="animal-bulk-create"),
+    path("animals/mine/", views.CaregiverAnimalList.as_view(), name="my-animals"),
+    path(
+        "animals/workload/",
+        views.CaregiverWorkloadView.as_view(),
+        name="caregiver-workload",
+    ),
+    path(
+        "animals/bulk-update/",
+        views.AnimalBulkUpdate.as_view(),
+        name="animal-bulk-update",
+    ),
+    path("animals/export/", views.AnimalExportView.as_view(), name="animal-export"),
     path("animals/<int:pk>/", views.AnimalDetail.as_view(), name="animal-detail"),
     path("messages/", views.MessageListCreate.as_view(), name="message-list"),
     path("messages/<int:pk>/", views.MessageDetail.as_view(), name="message-detail"),
@@ -25,6 +43,16 @@ urlpatterns = [
         views.VolunteerProfileList.as_view(),
         name="volunteer-profiles",
     ),
+    path(
+        "volunteer-profiles/export/",
+        views.VolunteerProfileExportView.as_view(),
+        name="volunteer-profile-export",
+    ),
+    path(
+        "volunteer-profiles/me/",
+        views.MyProfileView.as_view(),
+        name="my-volunteer-profile",
+    ),
     path(
         "volunteer-profiles/user/<int:user_id>/",
         views.VolunteerProfileDetail.as_view(),
@@ -51,8 +79,39 @@ urlpatterns = [
         name="user-status-choices",
     ),
     path("donations/", views.DonationListCreate.as_view(), name="donation-list"),
+    path(
+        "donations/export/",
+        views.DonationExportView.as_view(),
+        name="donation-export",
+    ),
+    path(
+        "donations/import/",
+        views.DonationImportView.as_view(),
+        name="donation-import",
+    ),
     path("funds/", views.FundsView.as_view(), name="funds"),
+    path(
+        "funds/timeseries/",
+        views.FundsTimeSeriesView.as_view(),
+        name="funds-timeseries",
+    ),
+    path(
+        "dashboard/summary/",
+        views.DashboardSummaryView.as_view(),
+        name="dashboard-summary",
+    ),
     path("expenses/", views.ExpenseListCreate.as_view(), name="expense-list"),
+    path(
+        "expenses/export/",
+        views.ExpenseExportView.as_view(),
+        name="expense-export",
+    ),
+    path(
+        "expenses/import/",
+        views.ExpenseImportView.as_view(),
+        name="expense-import",
+    ),
+    path("users/bulk/", views.UserBulkCreate.as_view(), name="user-bulk-create"),
     path("users/<int:pk>/", views.ManageUserView.as_view(), name="user-management"),
     path(
         "change-password/", ChangeOwnPasswordView.as_view(), name="change-own-password"
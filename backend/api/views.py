@@ -1,16 +1,52 @@
+import codecs
+import hashlib
+import json
 from django.contrib.auth.models import User, Group
-from django.db import models
-from django.db.models import Sum
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Sum
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
 from rest_framework import generics
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from .taxonomic_hierarchy import TaxonomicHierarchy
+from .authentication import ROLES_CLAIM
+from .caching import get_or_build
+from .db_routers import ReplicaReadMixin
+from .hashers import hashing_slot
+from .exports import CONTENT_TYPES, EXPORT_FORMATS, EXPORTS, iter_chunks, iter_lines
+from .fund_import import (
+    IMPORT_FORMATS,
+    detect_format,
+    find_decode_error,
+    import_rows,
+    iter_rows,
+)
+from .pagination import (
+    NewsCursorPagination,
+    TimestampCursorPagination,
+    VolunteerProfileCursorPagination,
+)
+from .search import search
+from .signals import (
+    bump_table_version,
+    get_table_version,
+    get_table_versions,
+)
 from .serializers import (
     UserSerializer,
     NoteSerializer,
     NewsSerializer,
+    NewsFilterSerializer,
+    PublicNewsFilterSerializer,
+    PublicNewsSerializer,
+    PublicAnimalSerializer,
     AnimalSerializer,
+    AnimalFilterSerializer,
+    AnimalBulkUpdateSerializer,
     VolunteerProfileSerializer,
     MessageSerializer,
     DonationSerializer,
@@ -28,14 +64,116 @@ from .models import (
     Message,
     Donation,
     Expenses,
+    FundLedger,
+    FundMonthlyRollup,
 )
+from datetime import datetime, time, timedelta
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
-from django.db.models.functions import TruncMonth
-from rest_framework.exceptions import PermissionDenied
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from django.contrib.auth.hashers import check_password
 
 
+def _etag_response(
+    request, data, etag=None, last_modified=None, cache_control="private, no-cache"
+):
+    """
+    Returns a Response for data tagged with an ETag.
+
+    The ETag is a content hash unless a precomputed one is given. If the
+    client already holds the same representation (If-None-Match, or
+    If-Modified-Since when last_modified is given) an empty 304 is sent
+    instead of the body.
+    """
+    if etag is None:
+        payload = json.dumps(data, sort_keys=True, default=str).encode()
+        etag = quote_etag(hashlib.md5(payload).hexdigest())
+
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = parse_http_date_safe(
+        request.headers.get("If-Modified-Since", "")
+    )
+    if if_none_match:
+        not_modified = etag in parse_etags(if_none_match)
+    else:
+        not_modified = (
+            last_modified is not None
+            and if_modified_since is not None
+            and int(last_modified) <= if_modified_since
+        )
+
+    response = Response(status=304) if not_modified else Response(data)
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = cache_control
+    return response
+
+
+class ConditionalListMixin:
+    """
+    Mixin for generic list views that lets clients revalidate a list they
+    already hold.
+
+    The ETag is built from the versions of the tables the list is read from
+    (see signals.get_table_versions), the user and the query string, so it
+    is known before the queryset is evaluated. A matching If-None-Match is
+    answered with an empty 304 without querying or serializing anything.
+
+    Set version_models to every model whose changes can alter the response,
+    including models shown through nested serializers. Views whose results
+    depend on permissions should include Group.
+    """
+
+    version_models = ()
+
+    def list(self, request, *args, **kwargs):
+        versions = get_table_versions(*self.version_models)
+        key = f"{type(self).__name__}:{request.user.pk}:{request.get_full_path()}:{versions}"
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=304)
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+def _parse_date_param(request, name, default):
+    """Returns a YYYY-MM-DD query parameter as a date, or default if absent."""
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+    return parsed
+
+
+def _start_of_day(day):
+    """Returns midnight at the start of a date in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _count_by_month(queryset, field):
+    """Returns {first day of month: row count} for a datetime field."""
+    rows = (
+        queryset.annotate(month=TruncMonth(field))
+        .values("month")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {row["month"].date(): row["count"] for row in rows}
+
+
 class eUserRoles:
     CEO, _ = Group.objects.get_or_create(name="ceo")
     BOARD, _ = Group.objects.get_or_create(name="board")
@@ -47,36 +185,38 @@ class eUserRoles:
 
 # View to get user roles
 class UserRolesView(APIView):
-    """API endpoint that returns the roles (groups) of the authenticated user."""
+    """
+    API endpoint that returns the roles (groups) of the authenticated user.
+
+    Access tokens carry the role names (see api.authentication) and were
+    checked to be current when the request was authenticated, so the roles
+    are answered from the token without a query.
+    """
 
     def get(self, request):
         """Get all group names for the authenticated user."""
-        user = request.user
-        roles = [group.name for group in user.groups.all()]
+        if request.auth is not None and ROLES_CLAIM in request.auth:
+            return Response({"roles": request.auth[ROLES_CLAIM]})
+
+        # Tokens issued before the roles claim existed
+        roles = [group.name for group in request.user.groups.all()]
         return Response({"roles": roles})
 
 
-class NoteListCreate(generics.ListCreateAPIView):
+class NoteListCreate(
+    ReplicaReadMixin, ConditionalListMixin, generics.ListCreateAPIView
+):
     serializer_class = NoteSerializer
 
     # Checks for authentication AND permissions
     permission_classes = [StrictPermissions]
+    version_models = (Note, User, Group)
 
     def get_queryset(self):
         """
         Gets notes user has permission to view.
         """
-        user = self.request.user
-        queryset = Note.objects.none()
-
-        for note in Note.objects.all():
-            if not note.boards:
-                if user.has_perm("api.view_note"):
-                    queryset |= Note.objects.filter(id=note.id)
-            elif Note.check_board_permissions(user, "view", note.boards):
-                queryset |= Note.objects.filter(id=note.id)
-
-        return queryset.distinct()
+        return Note.permitted(self.request.user, "view")
 
     def perform_create(self, serializer):
         if not serializer.is_valid():
@@ -102,17 +242,7 @@ class NoteDelete(generics.DestroyAPIView):
         """
         Gets notes the user has permission to delete.
         """
-        user = self.request.user
-        queryset = Note.objects.none()
-
-        for note in Note.objects.all():
-            if not note.boards:
-                if user.has_perm("api.delete_note"):
-                    queryset |= Note.objects.filter(id=note.id)
-            elif Note.check_board_permissions(user, "delete", note.boards):
-                queryset |= Note.objects.filter(id=note.id)
-
-        return queryset.distinct()
+        return Note.permitted(self.request.user, "delete")
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -133,6 +263,42 @@ class CreateUserView(generics.CreateAPIView):
         return user
 
 
+class UserBulkCreate(generics.CreateAPIView):
+    """
+    API endpoint for HR to onboard a cohort of volunteers in one request.
+
+    Accepts a JSON list of users in the same shape as registration. Every
+    user joins the volunteer role. Either every user is created or, if any
+    of them is invalid, none are and the response lists the errors per
+    user.
+    """
+
+    queryset = User.objects.all()
+    serializer_class = UserSerializer
+    permission_classes = [StrictPermissions]
+    MAX_USERS = 500
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response({"error": "Expected a list of users"}, status=400)
+        if len(request.data) > self.MAX_USERS:
+            return Response(
+                {"error": f"At most {self.MAX_USERS} users can be added at once"},
+                status=400,
+            )
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=201)
+
+    def perform_create(self, serializer):
+        serializer.save(groups=[eUserRoles.VOLUNTEER])
+        # bulk_create doesn't send post_save or m2m_changed
+        bump_table_version(sender=User)
+        bump_table_version(sender=VolunteerProfile)
+
+
 class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint for managing users. Only CEO and HR can manage users.
@@ -160,12 +326,14 @@ class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
         return User.objects.none()
 
 
-class TaxonomicRankChoicesView(APIView):
+class TaxonomicRankChoicesView(ReplicaReadMixin, APIView):
     """
     Returns valid choices for a specific taxonomic rank.
     """
 
     permission_classes = [AllowAny]
+    # The hierarchy is generated into the code, so it only changes on deploy
+    CACHE_TIMEOUT = 60 * 60
     RANK_ORDER = [
         "domain",
         "kingdom",
@@ -187,55 +355,371 @@ class TaxonomicRankChoicesView(APIView):
                 params[rank] = value
 
         try:
-            current = TaxonomicHierarchy().TAXONOMIC_HIERARCHY
-            for rank in self.RANK_ORDER:
-                if rank in params:
-                    if params[rank] == "Other":
-                        return Response({"choices": ["Other"]})
-                    elif params[rank] not in current:
-                        return Response({"choices": ["Other"]})
-                    current = current[params[rank]]
-                else:
-                    if isinstance(current, (set, list)):
-                        choices = list(current)
-                        if not choices:
-                            return Response({"choices": ["Other"]})
-                        if "Other" not in choices:
-                            choices.insert(0, "Other")
-                        return Response({"choices": choices})
-
-                    if isinstance(current, dict):
-                        choices = list(current.keys())
-                        if "Other" not in choices:
-                            choices.insert(0, "Other")
-                        return Response({"choices": choices})
-                    return Response({"choices": ["Other"]})
-
-            return Response({"choices": ["Other"]})
-
+            choices = get_or_build(
+                "taxonomic-choices",
+                hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest(),
+                lambda: self.get_choices(params),
+                self.CACHE_TIMEOUT,
+            )
         except Exception as e:
             return Response({"error": str(e)}, status=500)
 
+        return _etag_response(
+            request,
+            {"choices": choices},
+            cache_control=f"public, max-age={self.CACHE_TIMEOUT}",
+        )
+
+    def get_choices(self, params):
+        """Returns the valid choices for the first rank missing from params."""
+        current = TaxonomicHierarchy().TAXONOMIC_HIERARCHY
+        for rank in self.RANK_ORDER:
+            if rank in params:
+                if params[rank] == "Other":
+                    return ["Other"]
+                elif params[rank] not in current:
+                    return ["Other"]
+                current = current[params[rank]]
+            else:
+                if isinstance(current, (set, list)):
+                    choices = sorted(current)
+                    if not choices:
+                        return ["Other"]
+                    if "Other" not in choices:
+                        choices.insert(0, "Other")
+                    return choices
+
+                if isinstance(current, dict):
+                    choices = list(current.keys())
+                    if "Other" not in choices:
+                        choices.insert(0, "Other")
+                    return choices
+                return ["Other"]
+
+        return ["Other"]
+
+
+class NewsListCreate(
+    ReplicaReadMixin, ConditionalListMixin, generics.ListCreateAPIView
+):
+    """
+    API endpoint that lists and creates news, newest first.
 
-class NewsListCreate(generics.ListCreateAPIView):
-    queryset = News.objects.all()
+    Results are cursor paginated.
+
+    Query parameters:
+        type: Only news of this NewsType.
+        animal: Only news about this animal ID.
+        page_size: Items per page (default 20, max 100).
+    """
+
+    queryset = News.objects.select_related("author")
     serializer_class = NewsSerializer
     permission_classes = [StrictPermissions]
+    version_models = (News, User)
+    pagination_class = NewsCursorPagination
+
+    def get_queryset(self):
+        filters = NewsFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        return super().get_queryset().filter(**filters.validated_data)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
 class NewsDetail(generics.RetrieveUpdateDestroyAPIView):
-    queryset = News.objects.all()
+    queryset = News.objects.select_related("author")
     serializer_class = NewsSerializer
     permission_classes = [StrictPermissions]
 
 
-class AnimalListCreate(generics.ListCreateAPIView):
+class PublicCachedView(APIView):
+    """
+    Base class for anonymous, read-only endpoints used by the public site.
+
+    Responses are safe to store in shared caches: they carry Cache-Control,
+    ETag and Last-Modified headers and conditional requests are answered with
+    304. The serialized data is also cached server side, keyed on the
+    version of the model's table (see signals.get_table_versions), so any
+    save or delete makes old entries unreachable.
+
+    Subclasses set model and cache_name and implement get_data(params).
+    """
+
+    permission_classes = [AllowAny]
+    # Tokens are ignored so every client gets the same shareable response
+    authentication_classes = []
+    model = None
+    cache_name = None
+    filter_serializer_class = None
+    CACHE_TIMEOUT = 60 * 10
+    MAX_AGE = 60
+
+    def get_data(self, params):
+        raise NotImplementedError
+
+    def get(self, request):
+        params = {}
+        if self.filter_serializer_class is not None:
+            filters = self.filter_serializer_class(data=request.query_params)
+            filters.is_valid(raise_exception=True)
+            params = filters.validated_data
+
+        changed_at = get_table_version(self.model)
+        param_key = ",".join(f"{key}={value}" for key, value in sorted(params.items()))
+        cache_key = f"{self.cache_name}:{changed_at}:{param_key}"
+
+        def build():
+            data = self.get_data(params)
+            payload = json.dumps(data, sort_keys=True, default=str).encode()
+            return {"data": data, "etag": quote_etag(hashlib.md5(payload).hexdigest())}
+
+        entry = get_or_build("public", cache_key, build, self.CACHE_TIMEOUT)
+
+        return _etag_response(
+            request,
+            entry["data"],
+            etag=entry["etag"],
+            last_modified=changed_at,
+            cache_control=f"public, max-age={self.MAX_AGE}",
+        )
+
+
+class PublicNewsList(PublicCachedView):
+    """
+    Public endpoint for the latest news, newest first.
+
+    Query parameters:
+        type: Only news of this NewsType.
+        limit: Number of items (default 20, max 100).
+    """
+
+    model = News
+    cache_name = "news"
+    filter_serializer_class = PublicNewsFilterSerializer
+
+    def get_data(self, params):
+        params = dict(params)
+        limit = params.pop("limit")
+        news = News.objects.filter(**params).order_by("-date_posted")[:limit]
+        return PublicNewsSerializer(news, many=True).data
+
+
+class PublicAnimalList(PublicCachedView):
+    """
+    Public endpoint for the animals that are up for adoption: healthy ones
+    that have been reviewed by staff.
+    """
+
+    model = Animal
+    cache_name = "adoptable-animals"
+
+    def get_data(self, params):
+        animals = (
+            Animal.objects.filter(status=AnimalStatus.HEALTHY, needs_review=False)
+            .select_related("type")
+            .order_by("-date_added")
+        )
+        return PublicAnimalSerializer(animals, many=True).data
+
+
+class AnimalListCreate(
+    ReplicaReadMixin, ConditionalListMixin, generics.ListCreateAPIView
+):
+    """
+    API endpoint that lists and creates animals.
+
+    Query parameters:
+        status: Only animals with this AnimalStatus.
+        needs_review: "true" or "false".
+        caregiver: Only animals assigned to this user ID.
+    """
+
+    queryset = Animal.objects.select_related("type")
+    serializer_class = AnimalSerializer
+    permission_classes = [StrictPermissions]
+    version_models = (Animal,)
+
+    def get_queryset(self):
+        # A plain dict, because with a QueryDict a missing needs_review
+        # validates as False and would hide the animals waiting for review
+        filters = AnimalFilterSerializer(data=self.request.query_params.dict())
+        filters.is_valid(raise_exception=True)
+        return super().get_queryset().filter(**filters.validated_data)
+
+
+class AnimalBulkCreate(generics.CreateAPIView):
+    """
+    API endpoint for intake of many animals in one request.
+
+    Accepts a JSON list of animals in the same shape as AnimalListCreate.
+    Either every animal is created or, if any of them is invalid, none are
+    and the response lists the errors per animal.
+    """
+
     queryset = Animal.objects.all()
     serializer_class = AnimalSerializer
     permission_classes = [StrictPermissions]
+    MAX_ANIMALS = 1000
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response({"error": "Expected a list of animals"}, status=400)
+        if len(request.data) > self.MAX_ANIMALS:
+            return Response(
+                {"error": f"At most {self.MAX_ANIMALS} animals can be added at once"},
+                status=400,
+            )
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=201)
+
+    def perform_create(self, serializer):
+        serializer.save()
+        # bulk_create doesn't send post_save
+        bump_table_version(sender=Animal)
+
+
+class CaregiverAnimalList(ReplicaReadMixin, generics.ListAPIView):
+    """
+    API endpoint that lists the animals assigned to the authenticated user,
+    together with how many of them are in each status.
+
+    Query parameters:
+        status: Only list animals with this AnimalStatus. The counts always
+            cover every status.
+    """
+
+    serializer_class = AnimalSerializer
+    permission_classes = [StrictPermissions]
+    queryset = Animal.objects.select_related("type")
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(caregiver=self.request.user)
+        status = self.request.query_params.get("status")
+        if status:
+            if status not in AnimalStatus.values:
+                raise ValidationError(
+                    {"status": [f"Must be one of {AnimalStatus.values}."]}
+                )
+            queryset = queryset.filter(status=status)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        counts = {status: 0 for status in AnimalStatus.values}
+        for row in (
+            Animal.objects.filter(caregiver=request.user)
+            .values("status")
+            .annotate(count=Count("id"))
+            .order_by()
+        ):
+            counts[row["status"]] = row["count"]
+
+        animals = self.get_serializer(self.get_queryset(), many=True).data
+        return Response({"counts": counts, "results": animals})
+
+
+class CaregiverWorkloadView(ReplicaReadMixin, APIView):
+    """
+    API endpoint that returns how many animals each caregiver is assigned,
+    by status, for head caregivers making assignment decisions. Needs the
+    api.workload_view_animal permission.
+
+    Counts come from a single GROUP BY over the animal table. Caregivers
+    without any animals are listed with zero counts, and unassigned animals
+    are reported under a null caregiver.
+    """
+
+    permission_classes = [IsAuthenticated]
+    CAREGIVER_ROLES = [eUserRoles.HEAD_CAREGIVER.name, eUserRoles.CAREGIVER.name]
+
+    def get(self, request):
+        if not request.user.has_perm("api.workload_view_animal"):
+            raise PermissionDenied("You don't have permission to view caregiver workloads")
+
+        def empty_workload(caregiver_id, username):
+            return {
+                "caregiver": caregiver_id,
+                "username": username,
+                "total": 0,
+                "needs_review": 0,
+                "by_status": {status: 0 for status in AnimalStatus.values},
+            }
+
+        workloads = {
+            caregiver["id"]: empty_workload(caregiver["id"], caregiver["username"])
+            for caregiver in User.objects.filter(groups__name__in=self.CAREGIVER_ROLES)
+            .values("id", "username")
+            .distinct()
+        }
+
+        for row in (
+            Animal.objects.values("caregiver", "caregiver__username", "status")
+            .annotate(
+                count=Count("id"),
+                needs_review=Count("id", filter=models.Q(needs_review=True)),
+            )
+            .order_by()
+        ):
+            workload = workloads.setdefault(
+                row["caregiver"],
+                empty_workload(row["caregiver"], row["caregiver__username"]),
+            )
+            workload["by_status"][row["status"]] = row["count"]
+            workload["total"] += row["count"]
+            workload["needs_review"] += row["needs_review"]
+
+        return Response(
+            sorted(workloads.values(), key=lambda workload: -workload["total"])
+        )
+
+
+class AnimalBulkUpdate(APIView):
+    """
+    API endpoint that sets status, needs_review and/or caregiver on many
+    animals with a single UPDATE statement.
+
+    The animals are chosen either by an "ids" list or by a "filter" object
+    (status, needs_review, caregiver), e.g.
+    {"filter": {"needs_review": true}, "needs_review": false}.
+    Permissions are checked once for the whole request. The batch is all or
+    nothing: if any of the ids isn't an animal, nothing is updated.
+    """
+
+    queryset = Animal.objects.all()
+    permission_classes = [StrictPermissions]
+
+    def patch(self, request):
+        serializer = AnimalBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        changes = {
+            field: data[field]
+            for field in AnimalBulkUpdateSerializer.UPDATE_FIELDS
+            if field in data
+        }
+        with transaction.atomic():
+            if "ids" in data:
+                ids = set(data["ids"])
+                animals = Animal.objects.filter(id__in=ids)
+                missing = ids - set(
+                    animals.select_for_update().values_list("id", flat=True)
+                )
+                if missing:
+                    raise ValidationError(
+                        {"ids": [f"No animals with ids {sorted(missing)}."]}
+                    )
+            else:
+                animals = Animal.objects.filter(**data["filter"])
+            updated = animals.update(**changes)
+
+        # update() doesn't send post_save
+        bump_table_version(sender=Animal)
+        return Response({"updated": updated})
 
 
 class AnimalDetail(generics.RetrieveUpdateDestroyAPIView):
@@ -247,33 +731,120 @@ class AnimalDetail(generics.RetrieveUpdateDestroyAPIView):
 class VolunteerProfileDetail(generics.RetrieveUpdateAPIView):
     serializer_class = VolunteerProfileSerializer
     permission_classes = [StrictPermissions]
-    queryset = VolunteerProfile.objects.all()
+    queryset = VolunteerProfile.objects.select_related("user").prefetch_related(
+        "user__groups"
+    )
 
     def get_object(self):
-        user_id = self.kwargs.get('user_id')
-        if user_id:
-            return self.queryset.get(user_id=user_id)
-        return self.queryset.get(user=self.request.user)
+        user_id = self.kwargs.get("user_id", self.request.user.id)
+        profile = get_object_or_404(self.get_queryset(), user_id=user_id)
+        self.check_object_permissions(self.request, profile)
+        return profile
+
+
+class MyProfileView(APIView):
+    """
+    API endpoint that returns the authenticated user's own profile.
+
+    The user, profile and role names are read with one joined query and the
+    response carries an ETag, so an unchanged profile is answered with a 304.
+    """
 
+    permission_classes = [IsAuthenticated]
 
-class VolunteerProfileList(generics.ListAPIView):
-    """API endpoint that returns all volunteer profiles."""
+    def get(self, request):
+        # One row per role the user has (or a single row with no role)
+        rows = list(
+            VolunteerProfile.objects.select_related("user")
+            .filter(user=request.user)
+            .annotate(role_name=F("user__groups__name"))
+        )
+        if not rows:
+            raise NotFound("No profile exists for this user.")
+
+        profile = rows[0]
+        profile.user.role_names = [row.role_name for row in rows if row.role_name]
+        return _etag_response(request, VolunteerProfileSerializer(profile).data)
+
+
+class VolunteerProfileList(
+    ReplicaReadMixin, ConditionalListMixin, generics.ListAPIView
+):
+    """
+    API endpoint that returns volunteer profiles, one cursor page at a time.
+
+    Query parameters:
+        status: Only profiles with this UserStatus.
+        town: Only profiles from this town.
+        role: Only profiles whose user has one of these roles (comma separated).
+        search: Substring match on username, email or role name.
+        page_size: Number of profiles per page (max 100).
+    """
 
-    queryset = VolunteerProfile.objects.select_related("user").all()
+    queryset = VolunteerProfile.objects.select_related("user").prefetch_related(
+        "user__groups"
+    )
     serializer_class = VolunteerProfileSerializer
     permission_classes = [StrictPermissions]
+    version_models = (VolunteerProfile, User)
+    pagination_class = VolunteerProfileCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        status = params.get("status")
+        if status:
+            queryset = queryset.filter(status=status)
+
+        town = params.get("town")
+        if town:
+            queryset = queryset.filter(town=town)
+
+        roles = [role for role in params.get("role", "").split(",") if role]
+        if roles:
+            queryset = queryset.filter(user__groups__name__in=roles).distinct()
+
+        search = params.get("search")
+        if search:
+            # Role names are matched too, so searching "caregiver" lists them
+            has_matching_role = Exists(
+                User.groups.through.objects.filter(
+                    user_id=OuterRef("user_id"), group__name__icontains=search
+                )
+            )
+            queryset = queryset.filter(
+                models.Q(user__username__icontains=search)
+                | models.Q(user__email__icontains=search)
+                | has_matching_role
+            )
 
+        return queryset
 
-class ChoicesView(APIView):
+
+class ChoicesView(ReplicaReadMixin, APIView):
     """
     Base view for returning model choices.
+
+    Choices only change with the code, so responses are cached and clients
+    may reuse them for an hour.
     """
 
-    permission_classes = [StrictPermissions]
+    # StrictPermissions needs a queryset, which choices don't have
+    permission_classes = [IsAuthenticated]
     choices = None
+    CACHE_TIMEOUT = 60 * 60
 
     def get(self, request):
-        return Response({"choices": [value for _, value in self.choices.choices]})
+        data = get_or_build(
+            "choices",
+            self.choices.__name__,
+            lambda: {"choices": [value for _, value in self.choices.choices]},
+            self.CACHE_TIMEOUT,
+        )
+        return _etag_response(
+            request, data, cache_control=f"private, max-age={self.CACHE_TIMEOUT}"
+        )
 
 
 class NewsTypeChoicesView(ChoicesView):
@@ -288,9 +859,12 @@ class UserStatusChoicesView(ChoicesView):
     choices = UserStatus
 
 
-class MessageListCreate(generics.ListCreateAPIView):
+class MessageListCreate(
+    ReplicaReadMixin, ConditionalListMixin, generics.ListCreateAPIView
+):
     serializer_class = MessageSerializer
     permission_classes = [StrictPermissions]
+    version_models = (Message, User)
 
     def get_queryset(self):
         user = self.request.user
@@ -309,46 +883,487 @@ class MessageDetail(generics.RetrieveUpdateDestroyAPIView):
         return Message.objects.filter(models.Q(sender=user) | models.Q(receiver=user))
 
 
-class DonationListCreate(generics.ListCreateAPIView):
+class TimestampRangeMixin:
+    """
+    Mixin for list views of timestamped models that filters by a time range
+    and pages through it newest first.
+
+    Query parameters:
+        months: Include this many calendar months, counting the current one
+            (default 1). Ignored when from or to is given.
+        from: First date to include, YYYY-MM-DD (default: no lower bound
+            when to is given).
+        to: Last date to include, YYYY-MM-DD (default: no upper bound).
+        page_size: Number of rows per page (max 500).
+    """
+
+    pagination_class = TimestampCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+
+        try:
+            start = _parse_date_param(self.request, "from", None)
+            end = _parse_date_param(self.request, "to", None)
+        except ValueError as e:
+            raise ValidationError({"error": str(e)})
+
+        if start is None and end is None:
+            try:
+                months = int(params.get("months", 1))
+            except ValueError:
+                months = 0
+            if months < 1:
+                raise ValidationError({"error": "months must be a positive integer"})
+            start = (timezone.localdate() - relativedelta(months=months - 1)).replace(
+                day=1
+            )
+
+        # Compare against datetimes rather than timestamp__date so the
+        # timestamp index can be used
+        if start is not None:
+            queryset = queryset.filter(timestamp__gte=_start_of_day(start))
+        if end is not None:
+            queryset = queryset.filter(
+                timestamp__lt=_start_of_day(end + timedelta(days=1))
+            )
+        return queryset
+
+
+class DonationListCreate(
+    ReplicaReadMixin,
+    ConditionalListMixin,
+    TimestampRangeMixin,
+    generics.ListCreateAPIView,
+):
     queryset = Donation.objects.all()
     serializer_class = DonationSerializer
     permission_classes = [AllowAny]
-
-    def get_queryset(self):
-        months = int(self.request.query_params.get("months", 1))
-        start_date = timezone.now().replace(day=1) - relativedelta(months=months - 1)
-        return Donation.objects.filter(timestamp__gte=start_date).order_by("-timestamp")
+    version_models = (Donation,)
 
 
-class ExpenseListCreate(generics.ListCreateAPIView):
+class ExpenseListCreate(
+    ReplicaReadMixin,
+    ConditionalListMixin,
+    TimestampRangeMixin,
+    generics.ListCreateAPIView,
+):
     queryset = Expenses.objects.all()
     serializer_class = ExpensesSerializer
     permission_classes = [StrictPermissions]
+    version_models = (Expenses,)
 
-    def get_queryset(self):
-        months = int(self.request.query_params.get("months", 1))
-        start_date = timezone.now().replace(day=1) - relativedelta(months=months - 1)
-        return Expenses.objects.filter(timestamp__gte=start_date).order_by("-timestamp")
+
+class FundImportView(APIView):
+    """
+    Base view for bulk importing donations or expenses from an uploaded file.
+
+    The file is sent as multipart form data in the "file" field. Its format
+    is taken from the input_format query parameter ("csv" or "jsonl") or
+    from the file extension. Rows are streamed from the upload and inserted
+    in batches, valid rows are kept even when others fail, and the response
+    reports the failed rows.
+    """
+
+    permission_classes = [StrictPermissions]
+    parser_classes = [MultiPartParser]
+    import_kind = None
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "A file upload is required"}, status=400)
+
+        file_format = request.query_params.get("input_format") or detect_format(
+            upload.name
+        )
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"input_format must be one of {list(IMPORT_FORMATS)}"},
+                status=400,
+            )
+
+        # Checked up front because every batch is committed as it is imported
+        decode_error = find_decode_error(upload)
+        if decode_error is not None:
+            line, offset = decode_error
+            return Response(
+                {
+                    "error": "The file must be UTF-8 encoded, "
+                    f"line {line} is not (byte {offset})"
+                },
+                status=400,
+            )
+        upload.seek(0)
+
+        lines = codecs.iterdecode(upload, "utf-8-sig")
+        report = import_rows(self.import_kind, iter_rows(lines, file_format))
+
+        return Response(report.to_dict(), status=201 if report.created else 400)
 
 
-class FundsView(APIView):
+class DonationImportView(FundImportView):
+    queryset = Donation.objects.all()
+    import_kind = "donations"
+
+
+class ExpenseImportView(FundImportView):
+    queryset = Expenses.objects.all()
+    import_kind = "expenses"
+
+
+class ExportView(APIView):
+    """
+    Base view for streaming a whole table as a file download.
+
+    Query parameters:
+        output_format: "csv" (default) or "jsonl".
+        gzip: "true" to gzip compress the download.
+    """
+
+    permission_classes = [StrictPermissions]
+    export_kind = None
+
+    def get(self, request):
+        output_format = request.query_params.get("output_format", "csv")
+        if output_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output_format must be one of {list(EXPORT_FORMATS)}"},
+                status=400,
+            )
+        compress = request.query_params.get("gzip", "").lower() in ("1", "true")
+
+        lines = iter_lines(EXPORTS[self.export_kind], output_format)
+        response = StreamingHttpResponse(
+            iter_chunks(lines, compress=compress),
+            content_type="application/gzip" if compress else CONTENT_TYPES[output_format],
+        )
+        filename = f"{self.export_kind}.{output_format}" + (".gz" if compress else "")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class DonationExportView(ExportView):
+    queryset = Donation.objects.all()
+    export_kind = "donations"
+
+
+class ExpenseExportView(ExportView):
+    queryset = Expenses.objects.all()
+    export_kind = "expenses"
+
+
+class AnimalExportView(ExportView):
+    queryset = Animal.objects.all()
+    export_kind = "animals"
+
+
+class VolunteerProfileExportView(ExportView):
+    queryset = VolunteerProfile.objects.all()
+    export_kind = "volunteer_profiles"
+
+
+class SearchView(APIView):
+    """
+    API endpoint for full-text search across news, notes and messages.
+
+    Only documents the user could see through the matching list views are
+    returned, best match first.
+
+    Query parameters:
+        q: The words to search for.
+        types: Comma separated document types to search (default: all of
+            news, note, message).
+        limit: Maximum results per type (default 20, max 50).
+    """
+
+    permission_classes = [IsAuthenticated]
+    SERIALIZERS = {
+        "news": NewsSerializer,
+        "note": NoteSerializer,
+        "message": MessageSerializer,
+    }
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"error": "q is required"}, status=400)
+
+        doc_types = [
+            doc_type
+            for doc_type in request.query_params.get("types", "").split(",")
+            if doc_type
+        ] or list(self.SERIALIZERS)
+        unknown = [doc_type for doc_type in doc_types if doc_type not in self.SERIALIZERS]
+        if unknown:
+            return Response(
+                {"error": f"types must be in {list(self.SERIALIZERS)}"}, status=400
+            )
+
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 50)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+
+        results = search(request.user, query, doc_types, limit=limit)
+        return Response(
+            {
+                doc_type: self.SERIALIZERS[doc_type](documents, many=True).data
+                for doc_type, documents in results.items()
+            }
+        )
+
+
+class FundsView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def get_totals():
+        """Returns the total donations, total expenses and available funds."""
+        # Totals are kept up to date by the ledger, no need to sum the tables
+        ledger = FundLedger.current()
+
+        return {
+            'total_donations': ledger.total_donations,
+            'total_expenses': ledger.total_expenses,
+            'available_funds': ledger.available_funds
+        }
+
+    def get(self, request):
+        return Response(self.get_totals())
+
+
+class FundsTimeSeriesView(ReplicaReadMixin, APIView):
+    """
+    API endpoint that returns donation and expense totals per time bucket.
+
+    Monthly buckets are read straight from the FundMonthlyRollup rows. Daily
+    and weekly buckets are grouped by the database over the requested range.
+    Either way the response has one entry per bucket, with empty buckets
+    filled with zeros.
+
+    Query parameters:
+        bucket: "day", "week" or "month" (default "month").
+        from: First date to include, YYYY-MM-DD (default: start of the month
+            seven months ago).
+        to: Last date to include, YYYY-MM-DD (default: today).
+    """
+
     permission_classes = [IsAuthenticated]
+    MAX_BUCKETS = 400
+    BUCKETS = {
+        "day": (TruncDay, relativedelta(days=1)),
+        "week": (TruncWeek, relativedelta(weeks=1)),
+        "month": (TruncMonth, relativedelta(months=1)),
+    }
 
     def get(self, request):
-        # Calculate total donations
-        total_donations = Donation.objects.aggregate(total=Sum('usd_amount'))['total'] or 0
-        
-        # Calculate total expenses
-        total_expenses = Expenses.objects.aggregate(total=Sum('usd_amount'))['total'] or 0
-        
-        # Calculate available funds
-        available_funds = total_donations - total_expenses
-        
-        return Response({
-            'total_donations': total_donations,
-            'total_expenses': total_expenses,
-            'available_funds': available_funds
-        })
+        bucket = request.query_params.get("bucket", "month")
+        if bucket not in self.BUCKETS:
+            return Response(
+                {"error": f"bucket must be one of {list(self.BUCKETS)}"}, status=400
+            )
+
+        today = timezone.localdate()
+        try:
+            end = _parse_date_param(request, "to", today)
+            start = _parse_date_param(
+                request, "from", (today - relativedelta(months=7)).replace(day=1)
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+        if start > end:
+            return Response({"error": "from must not be after to"}, status=400)
+
+        periods = self.get_periods(bucket, start, end)
+        if len(periods) > self.MAX_BUCKETS:
+            return Response(
+                {"error": f"Requested range spans more than {self.MAX_BUCKETS} buckets"},
+                status=400,
+            )
+
+        if bucket == "month":
+            totals = self.get_monthly_totals(periods[0], end)
+        else:
+            totals = self.get_grouped_totals(bucket, periods[0], end)
+
+        empty = {"donations": 0, "donations_count": 0, "expenses": 0, "expenses_count": 0}
+        return Response(
+            {
+                "bucket": bucket,
+                "from": start,
+                "to": end,
+                "results": [
+                    {"period": period, **totals.get(period, empty)}
+                    for period in periods
+                ],
+            }
+        )
+
+    def get_periods(self, bucket, start, end):
+        """Returns the first day of every bucket between start and end."""
+        if bucket == "month":
+            period = start.replace(day=1)
+        elif bucket == "week":
+            # Weeks start on Monday, like the database's week truncation
+            period = start - timedelta(days=start.weekday())
+        else:
+            period = start
+
+        step = self.BUCKETS[bucket][1]
+        periods = []
+        while period <= end and len(periods) <= self.MAX_BUCKETS:
+            periods.append(period)
+            period += step
+        return periods
+
+    def get_monthly_totals(self, start, end):
+        return {
+            rollup.month: {
+                "donations": rollup.donations_total,
+                "donations_count": rollup.donations_count,
+                "expenses": rollup.expenses_total,
+                "expenses_count": rollup.expenses_count,
+            }
+            for rollup in FundMonthlyRollup.objects.filter(
+                month__gte=start, month__lte=end
+            )
+        }
+
+    def get_grouped_totals(self, bucket, start, end):
+        trunc = self.BUCKETS[bucket][0]
+        totals = {}
+        for model, prefix in ((Donation, "donations"), (Expenses, "expenses")):
+            rows = (
+                model.objects.filter(
+                    timestamp__gte=_start_of_day(start),
+                    timestamp__lt=_start_of_day(end + timedelta(days=1)),
+                )
+                .annotate(period=trunc("timestamp"))
+                .values("period")
+                .annotate(total=Sum("usd_amount"), count=Count("id"))
+                .order_by()
+            )
+            for row in rows:
+                values = totals.setdefault(
+                    row["period"].date(),
+                    {"donations": 0, "donations_count": 0, "expenses": 0, "expenses_count": 0},
+                )
+                values[prefix] = row["total"]
+                values[f"{prefix}_count"] = row["count"]
+        return totals
+
+
+class DashboardSummaryView(ReplicaReadMixin, APIView):
+    """
+    API endpoint that returns everything the dashboard overview needs at once.
+
+    Animal and volunteer numbers are grouped counts rather than full rows, so
+    the response stays a few kilobytes no matter how large the tables get. The
+    result is cached under the versions of the summarized tables, so it is
+    rebuilt as soon as one of them changes.
+
+    Query parameters:
+        news: Number of latest news items to include (default 5, max 50).
+    """
+
+    permission_classes = [IsAuthenticated]
+    version_models = (Animal, VolunteerProfile, User, News, Donation, Expenses)
+    # Entries are keyed on the table versions, so this only bounds how stale
+    # the date based counts (last 30 days, current month) can get
+    CACHE_TIMEOUT = 60 * 5
+    CHART_MONTHS = 8
+
+    def get(self, request):
+        try:
+            news_limit = min(max(int(request.query_params.get("news", 5)), 0), 50)
+        except ValueError:
+            return Response({"error": "news must be an integer"}, status=400)
+
+        versions = ":".join(map(str, get_table_versions(*self.version_models)))
+        summary = get_or_build(
+            "dashboard-summary",
+            f"{versions}:{news_limit}",
+            lambda: self.build_summary(news_limit),
+            self.CACHE_TIMEOUT,
+        )
+        return Response(summary)
+
+    def build_summary(self, news_limit):
+        now = timezone.now()
+        chart_start = (now - relativedelta(months=self.CHART_MONTHS - 1)).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        months = [
+            (chart_start + relativedelta(months=i)).date()
+            for i in range(self.CHART_MONTHS)
+        ]
+
+        # Animals grouped by status and review state
+        animals_by_status = {status: 0 for status in AnimalStatus.values}
+        needs_review = approved = 0
+        for row in Animal.objects.values("status", "needs_review").annotate(
+            count=Count("id")
+        ):
+            animals_by_status[row["status"]] = (
+                animals_by_status.get(row["status"], 0) + row["count"]
+            )
+            if row["needs_review"]:
+                needs_review += row["count"]
+            else:
+                approved += row["count"]
+
+        approved_last_30_days = Animal.objects.filter(
+            needs_review=False, date_added__gte=now - timedelta(days=30)
+        ).count()
+
+        animals_by_month = _count_by_month(
+            Animal.objects.filter(needs_review=False, date_added__gte=chart_start),
+            "date_added",
+        )
+
+        # Volunteers grouped by status
+        volunteers_by_status = {status: 0 for status in UserStatus.values}
+        for row in VolunteerProfile.objects.values("status").annotate(
+            count=Count("id")
+        ):
+            volunteers_by_status[row["status"]] = row["count"]
+
+        volunteers_by_month = _count_by_month(
+            User.objects.filter(
+                groups__name=eUserRoles.VOLUNTEER.name, date_joined__gte=chart_start
+            ),
+            "date_joined",
+        )
+
+        latest_news = News.objects.select_related("author").order_by("-date_posted")[
+            :news_limit
+        ]
+
+        return {
+            "animals": {
+                "total": sum(animals_by_status.values()),
+                "by_status": animals_by_status,
+                "needs_review": needs_review,
+                "approved": approved,
+                "approved_last_30_days": approved_last_30_days,
+                "approved_by_month": [
+                    {"month": month, "count": animals_by_month.get(month, 0)}
+                    for month in months
+                ],
+            },
+            "volunteers": {
+                "total": sum(volunteers_by_status.values()),
+                "by_status": volunteers_by_status,
+                "joined_by_month": [
+                    {"month": month, "count": volunteers_by_month.get(month, 0)}
+                    for month in months
+                ],
+            },
+            "funds": FundsView.get_totals(),
+            "news": NewsSerializer(latest_news, many=True).data,
+        }
 
 
 class ChangeOwnPasswordView(APIView):
@@ -359,7 +1374,8 @@ class ChangeOwnPasswordView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        user = request.user
+        # request.user is built from the token and has no password hash
+        user = User.objects.get(pk=request.user.pk)
         current_password = request.data.get("current_password")
         new_password = request.data.get("new_password")
 
@@ -369,10 +1385,12 @@ class ChangeOwnPasswordView(APIView):
                 status=400,
             )
 
-        if not check_password(current_password, user.password):
-            return Response({"error": "Current password is incorrect"}, status=400)
-
-        user.set_password(new_password)
+        with hashing_slot():
+            if not check_password(current_password, user.password):
+                return Response(
+                    {"error": "Current password is incorrect"}, status=400
+                )
+            user.set_password(new_password)
         user.save()
         return Response({"message": "Password changed successfully"})
 
@@ -397,6 +1415,7 @@ class AdminChangePasswordView(APIView):
         if not new_password:
             return Response({"error": "new_password is required"}, status=400)
 
-        user.set_password(new_password)
+        with hashing_slot():
+            user.set_password(new_password)
         user.save()
         return Response({"message": "Password changed successfully"})
@@ -41,8 +41,9 @@ This configuration sets up JSON Web Token (JWT) authentication for the Django RE
 REST_FRAMEWORK:
 -------------
 1. DEFAULT_AUTHENTICATION_CLASSES:
-   - Uses 'rest_framework_simplejwt.authentication.JWTAuthentication' as the primary authentication method
+   - Uses 'api.authentication.ClaimsJWTAuthentication' as the primary authentication method
    - Instructs Django REST Framework to verify JWT tokens sent in request headers
+   - Builds the user from the token claims instead of loading it on every request
 
 2. DEFAULT_PERMISSION_CLASSES:
    - Sets 'rest_framework.permissions.IsAuthenticated' as the default permission
@@ -68,7 +69,7 @@ This two-token system implements security best practices by separating authentic
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -78,8 +79,14 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "api.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.serializers.ClaimsTokenRefreshSerializer",
 }
 
+# Seconds a worker trusts its memoized user state (roles, permissions, active
+# flag) before reloading it, see api/authentication.py
+AUTH_STATE_TTL = 10
+
 
 # Application definition
 
@@ -104,6 +111,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
+    "api.db_routers.PrimaryPinMiddleware",
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -130,13 +138,161 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+"""
+Database Profiles
+=================
+
+DJANGO_DB_PROFILE picks how the SQLite database is opened:
+
+- "development" (default): Django's defaults, a new connection per request
+  and the rollback journal.
+- "production": tuned for several workers writing concurrently. Connections
+  are kept open for CONN_MAX_AGE seconds and set up with SQLITE_PRAGMAS
+  when they are created:
+    - journal_mode=WAL lets readers continue while a write is in progress
+      (the setting is stored in the database file and persists).
+    - synchronous=NORMAL only syncs at WAL checkpoints, which is safe in WAL
+      mode (a power loss can undo the last commits but not corrupt the file).
+    - busy_timeout makes a blocked writer wait instead of failing at once
+      with "database is locked".
+    - mmap_size and cache_size keep more of the database in memory.
+  Transactions start with BEGIN IMMEDIATE so writers queue for the write
+  lock up front instead of failing when upgrading a read lock.
+- "postgresql": PostgreSQL for real write concurrency, configured with
+  POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST and
+  POSTGRES_PORT. Needs the psycopg package. For a local server run:
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+  then `DJANGO_DB_PROFILE=postgresql python manage.py migrate`.
+  `DJANGO_DB_PROFILE=postgresql python manage.py test api` runs the tests
+  against it, as the CI workflow does for both SQLite and PostgreSQL.
+
+`python manage.py benchmark_sqlite` compares both profiles under
+concurrent reads and writes.
+"""
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 20000,  # milliseconds
+    "mmap_size": 128 * 1024 * 1024,  # bytes
+    "cache_size": -32000,  # negative means KiB, so about 32 MB per connection
+    "temp_store": "MEMORY",
+}
+
+DATABASE_PROFILES = {
+    "development": {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    "production": {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_PRAGMAS["busy_timeout"] / 1000,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ";".join(
+                f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+            ),
+        },
+    },
+    "postgresql": {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv("POSTGRES_DB", "nostray"),
+        'USER': os.getenv("POSTGRES_USER", "postgres"),
+        'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
+        'HOST': os.getenv("POSTGRES_HOST", "localhost"),
+        'PORT': os.getenv("POSTGRES_PORT", "5432"),
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+DB_PROFILE = os.getenv("DJANGO_DB_PROFILE", "development")
+
+DATABASES = {
+    'default': DATABASE_PROFILES[DB_PROFILE],
+}
+
+"""
+Read Replica
+============
+
+Set DJANGO_REPLICA_DB to the replica's database name (for SQLite, the path
+of a copy of db.sqlite3) and, for PostgreSQL, DJANGO_REPLICA_HOST to its
+host to serve GET requests of list, choices and funds
+views from it (see api/db_routers.py). Users who just wrote something and
+tables that just changed are read from the primary for REPLICA_MAX_LAG
+seconds, which must cover the replication delay.
+"""
+
+REPLICA_MAX_LAG = int(os.getenv("DJANGO_REPLICA_MAX_LAG", "5"))
+
+if os.getenv("DJANGO_REPLICA_DB"):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv("DJANGO_REPLICA_DB"),
+        'HOST': os.getenv(
+            "DJANGO_REPLICA_HOST", DATABASES['default'].get('HOST', '')
+        ),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ["api.db_routers.PrimaryReplicaRouter"]
+
+
+"""
+Cache Configuration
+===================
+
+The API caches choices, public reads and dashboard summaries, and keeps the
+per-table version stamps used to invalidate them in the same cache (see
+api/caching.py and api/signals.py). Pick the backend with DJANGO_CACHE:
+
+- "locmem" (default for the development DB profile): per-process memory.
+  Fine for development and a single worker, but every worker keeps its own
+  copy and its own versions. A worker doesn't see the version bumps of
+  writes other workers handled, so versions expire after
+  TABLE_VERSION_TIMEOUT seconds to bound how long it serves stale data.
+- "file" (default for the other DB profiles): files under DJANGO_CACHE_DIR
+  (default BASE_DIR/.cache), shared by all workers on the same machine.
+- "db": the django_cache table in the default database, shared by every
+  worker on every machine. Create it once with
+  `python manage.py createcachetable`.
+
+Versions in a shared cache never expire.
+"""
+
+CACHE_BACKEND = os.getenv(
+    "DJANGO_CACHE", "locmem" if DB_PROFILE == "development" else "file"
+)
+
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "nostray",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("DJANGO_CACHE_DIR", str(BASE_DIR / ".cache")),
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+}
+
+CACHES = {
+    "default": {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
     }
 }
 
+TABLE_VERSION_TIMEOUT = 30 if CACHE_BACKEND == "locmem" else None
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -157,6 +313,59 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+"""
+Password Hashing
+================
+
+PASSWORD_HASHER picks the hasher for new and changed passwords:
+
+- "scrypt" (default): memory-hard and built into Python.
+- "argon2": needs the argon2-cffi package.
+- "pbkdf2": Django's default before.
+
+The other hashers stay listed so existing hashes still verify. They are
+rehashed with the chosen hasher and cost on the user's next login, as are
+hashes made with a different cost. The costs below default to Django's
+values. Compare them with `python manage.py benchmark_password_hashing`.
+
+PASSWORD_HASHING_CONCURRENCY caps the hashes run at once on the host, by
+all worker processes together (see api/hashers.py). The workers share lock
+files in PASSWORD_HASHING_SLOT_DIR, which must be on a local file system.
+Login and password requests wait up to PASSWORD_HASHING_MAX_WAIT seconds
+for a slot, then get a 429.
+"""
+
+PASSWORD_HASHING = {
+    "PBKDF2_ITERATIONS": int(os.getenv("PBKDF2_ITERATIONS", "870000")),
+    "SCRYPT_WORK_FACTOR": int(os.getenv("SCRYPT_WORK_FACTOR", str(2**14))),
+    "SCRYPT_BLOCK_SIZE": int(os.getenv("SCRYPT_BLOCK_SIZE", "8")),
+    "SCRYPT_PARALLELISM": int(os.getenv("SCRYPT_PARALLELISM", "5")),
+    "ARGON2_TIME_COST": int(os.getenv("ARGON2_TIME_COST", "2")),
+    "ARGON2_MEMORY_COST": int(os.getenv("ARGON2_MEMORY_COST", "102400")),  # KiB
+    "ARGON2_PARALLELISM": int(os.getenv("ARGON2_PARALLELISM", "8")),
+    "MAX_CONCURRENT": int(
+        os.getenv(
+            "PASSWORD_HASHING_CONCURRENCY", str(max(1, (os.cpu_count() or 2) // 2))
+        )
+    ),
+    "MAX_WAIT": float(os.getenv("PASSWORD_HASHING_MAX_WAIT", "5")),
+    "SLOT_DIR": os.getenv(
+        "PASSWORD_HASHING_SLOT_DIR", str(BASE_DIR / ".hashing-slots")
+    ),
+}
+
+PASSWORD_HASHER_CLASSES = {
+    "scrypt": "api.hashers.TunedScryptPasswordHasher",
+    "argon2": "api.hashers.TunedArgon2PasswordHasher",
+    "pbkdf2": "api.hashers.TunedPBKDF2PasswordHasher",
+}
+
+_password_hasher = os.getenv("PASSWORD_HASHER", "scrypt")
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[_password_hasher]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != _password_hasher
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
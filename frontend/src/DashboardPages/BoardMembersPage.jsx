@@ -34,6 +34,20 @@ const BoardMembersPage = () => {
     fetchAnimals(); 
   }, []);
 
+  // Approve every animal awaiting review with a single request
+  const handleApproveAll = async () => {
+    if (!window.confirm(`Approve all ${animals.length} animals awaiting review?`)) {
+      return;
+    }
+    try {
+      await api.bulkUpdateAnimals({ filter: { needs_review: true }, needs_review: false });
+      fetchAnimals();
+    } catch (err) {
+      console.error('Error approving animals:', err);
+      setError('Failed to approve animals. Please try again later.');
+    }
+  };
+
   // Calls the meeting form modal when an animal is selected for review
   const handleCallMeeting = (animal) => {
     setSelectedAnimal(animal);
@@ -58,10 +72,18 @@ const BoardMembersPage = () => {
         transition={{ duration: 0.5 }}
       >
         <div className='w-full max-w-6xl mx-auto'>
-          <div className='mb-6'>
+          <div className='mb-6 flex justify-between items-center'>
             <h2 className='text-2xl font-bold text-white'>
               Review New Animal Board
             </h2>
+            {!isLoading && animals.length > 0 && (
+              <button
+                className='bg-green-600 hover:bg-green-700 text-white font-medium py-2 px-4 rounded-lg'
+                onClick={handleApproveAll}
+              >
+                Approve All
+              </button>
+            )}
           </div>
 
           {isLoading ? (
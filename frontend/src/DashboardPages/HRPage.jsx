@@ -16,14 +16,12 @@ const HRPage = () => {
   useEffect(() => {
     const fetchTeamStats = async () => {
       try {
-        const response = await api.get("/api/volunteer-profiles/");
-        const activeVolunteers = response.data.filter(
-          (profile) => profile.status === "active"
-        ).length;
+        const response = await api.getDashboardSummary({ news: 0 });
+        const { volunteers } = response.data;
         // thinking could add time filter here in future for 'new' cut off
         setTeamStats({
-          teamMembers: response.data.length,
-          newVolunteers: activeVolunteers,
+          teamMembers: volunteers.total,
+          newVolunteers: volunteers.by_status.active,
         });
       } catch (err) {
         console.error("Error fetching team stats:", err);
@@ -19,13 +19,10 @@ function MessagesPage() {
     fetchUserRoles();
   }, []);
 
-  // Function to fetch user roles from the API
+  // Function to fetch user roles, read from the access token when possible
   const fetchUserRoles = async () => {
     try {
-      const response = await api.get("/api/user/roles/");
-      if (response.status === 200) {
-        setUserRoles(response.data.roles || []);
-      }
+      setUserRoles(await api.getUserRoles());
     } catch (err) {
       console.error("Error fetching user roles:", err);
     }
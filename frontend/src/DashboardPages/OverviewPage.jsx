@@ -22,16 +22,14 @@ const OverviewPage = () => {
         error: false
     });
 
-    // Fetch news when the component mounts and listen for news creation events
+    // Fetch the dashboard summary when the component mounts and listen for news creation events
     useEffect(() => {
-        fetchNews();
-        fetchFunds();
-        fetchAnimalsData();
+        fetchSummary();
 
         // this function will be called when the custom event 'newsCreated' is dispatched
         const refreshNewsOnCreation = () => {
             console.log('News refresh triggered by newsCreated event');
-            fetchNews(); // Re-fetch news to update the list
+            fetchSummary(); // Re-fetch the summary to update the news list
         };
 
         // Listen for the custom event dispatched from HRPage
@@ -43,71 +41,38 @@ const OverviewPage = () => {
         };
     }, []);
 
-    // Function to fetch animal data from API
-    const fetchAnimalsData = async () => {
-        // Set loading state to true and error state to false
+    // Function to fetch animal counts, funds and the latest news in one request
+    const fetchSummary = async () => {
+        setIsLoading(true);
         setAnimalsData(prevState => ({
             ...prevState,
             loading: true,
             error: false
         }));
-        
+
         try {
-            const response = await api.getAnimals();
-            
-            // Display all animals that don't need review (approved animals)
-            const approvedAnimals = response.data.filter(animal => animal.needs_review === false);
-            
-            // Calculate number of new animals added in the last 30 days
-            const now = new Date();
-            const LastThirtyDays = new Date(now);
-            LastThirtyDays.setDate(now.getDate() - 30);
-            
-            // Filter animals added in the last 30 days
-            const newAnimals = approvedAnimals.filter(animal => {
-                const addedDate = new Date(animal.date_added);
-                return addedDate >= LastThirtyDays;
-            });
+            const response = await api.getDashboardSummary({ news: 5 });
+            const { animals, funds, news } = response.data;
 
-            // Update the state with the new data
+            // Display all animals that don't need review (approved animals)
             setAnimalsData({
-                totalAnimals: approvedAnimals.length,
-                newAnimalsAdded: newAnimals.length,
+                totalAnimals: animals.approved,
+                newAnimalsAdded: animals.approved_last_30_days,
                 loading: false,
                 error: false
             });
+            setTotalFunds(funds.available_funds);
+            setFundsError(false);
+            setNews(news);
+            setError(null);
         } catch (err) {
-            console.error('Error fetching animals data:', err);
+            console.error('Error fetching dashboard summary:', err);
             setAnimalsData(prevState => ({
                 ...prevState,
                 loading: false,
                 error: true
             }));
-        }
-    };
-
-    // Function to fetch funds from API
-    const fetchFunds = async () => {
-        try {
-            const response = await api.getFunds();
-            setTotalFunds(response.data.available_funds);
-            setFundsError(false);
-        } catch (err) {
-            console.error('Error fetching funds:', err);
             setFundsError(true);
-        }
-    };
-
-    // Function to fetch news from API
-    const fetchNews = async () => {
-        setIsLoading(true);
-        try {
-            // Send GET request to fetch news data
-            const response = await api.get('/api/news/');
-            setNews(response.data);
-            setError(null);
-        } catch (err) {
-            console.error('Error fetching news:', err);
             setError('Failed to load news. Please try again later.');
         } finally {
             setIsLoading(false);
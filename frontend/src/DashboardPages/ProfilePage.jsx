@@ -5,18 +5,31 @@ import { motion } from "framer-motion";
 import api from "../api";
 
 const ProfilePage = () => {
+  const [myProfile, setMyProfile] = useState(null);
   const [userProfiles, setUserProfiles] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [activeTab, setActiveTab] = useState("staff"); // Display staff members by default
 
   const staffRoles = ["ceo", "hr", "board", "head caregiver", "caregiver"]; // Define staff roles
+
+  // Fetch the logged in user's own profile once
+  useEffect(() => {
+    api.getMyProfile()
+      .then((response) => setMyProfile(response.data))
+      .catch((err) => console.error("Error fetching own profile:", err));
+  }, []);
+
   useEffect(() => {
     const fetchProfiles = async () => {
       try {
         setLoading(true);
-        const response = await api.get("/api/volunteer-profiles/");
-        setUserProfiles(response.data);
+        // Only download the first page of profiles for the active tab
+        const roles = activeTab === "staff" ? staffRoles : ["volunteer"];
+        const response = await api.getVolunteerProfiles({ role: roles.join(",") });
+        setUserProfiles(response.data.results);
+        setNextPage(response.data.next);
       } catch (err) {
         console.error("Error fetching profiles:", err);
         setError("Failed to load profiles. Please try again later.");
@@ -26,7 +39,19 @@ const ProfilePage = () => {
     };
 
     fetchProfiles();
-  }, []);
+  }, [activeTab]);
+
+  // Append the next page of profiles for the active tab
+  const loadMoreProfiles = async () => {
+    try {
+      const response = await api.get(nextPage);
+      setUserProfiles((current) => [...current, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error("Error fetching profiles:", err);
+      setError("Failed to load profiles. Please try again later.");
+    }
+  };
 
   // Filter profiles based on the active tab
   const filteredProfiles = userProfiles.filter(profile => {
@@ -53,6 +78,13 @@ const ProfilePage = () => {
         transition={{ duration: 0.5 }}
       >
         <div className="w-full max-w-4xl mx-auto">
+          {myProfile && (
+            <>
+              <h2 className="text-2xl font-bold text-white mb-6">My Profile</h2>
+              <ProfileCard volunteerProfile={myProfile} />
+            </>
+          )}
+
           <h2 className="text-2xl font-bold text-white mb-6">
             Staff and Volunteers Profiles
           </h2>
@@ -106,6 +138,17 @@ const ProfilePage = () => {
               )}
             </div>
           )}
+
+          {!loading && !error && nextPage && (
+            <div className="p-4 text-center">
+              <button
+                className="text-blue-500 hover:text-blue-400 text-sm font-medium"
+                onClick={loadMoreProfiles}
+              >
+                Load more profiles
+              </button>
+            </div>
+          )}
         </div>
       </motion.main>
     </div>
@@ -3,8 +3,9 @@
  * Anytime I send a request it will check if the token is in the local storage and if it is it will add it to the header
  */
 
-import { ACCESS_TOKEN } from './constants';
+import { ACCESS_TOKEN, REFRESH_TOKEN } from './constants';
 import axios from 'axios';
+import { jwtDecode } from 'jwt-decode';
 
 const api = axios.create({
     baseURL: import.meta.env.VITE_API_URL, //This will load the api url from the .env file
@@ -24,15 +25,77 @@ api.interceptors.request.use(
     }
 );
 
+//When the user's roles or password change the server rejects older access tokens as stale,
+//so get a new access token with the refresh token and retry the request once
+api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const { config, response } = error;
+        const refreshToken = localStorage.getItem(REFRESH_TOKEN);
+        if (response?.status === 401 && response.data?.code === 'token_stale' && refreshToken && !config._retried) {
+            config._retried = true;
+            const res = await api.post('/api/token/refresh/', { refresh: refreshToken });
+            localStorage.setItem(ACCESS_TOKEN, res.data.access);
+            return api(config);
+        }
+        return Promise.reject(error);
+    }
+);
+
+//api for getting the logged in user's roles, read from the access token when it carries them
+//so route guards don't need a request (older tokens fall back to asking the server)
+api.getUserRoles = async () => {
+    const token = localStorage.getItem(ACCESS_TOKEN);
+    if (token) {
+        try {
+            const { roles } = jwtDecode(token);
+            if (Array.isArray(roles)) {
+                return roles;
+            }
+        } catch (error) {
+            console.error("Could not read roles from the access token:", error);
+        }
+    }
+    const response = await api.get('/api/user/roles/');
+    return response.data.roles || [];
+};
+
+//api for getting the grouped dashboard counts, fund totals and latest news in one request
+api.getDashboardSummary = (params = {}) => api.get('/api/dashboard/summary/', { params });
+
 //api for getting the total funds
 api.getFunds = () => api.get('/api/funds/');
 
-//api for getting volunteer profiles
-api.getVolunteerProfiles = () => api.get('/api/volunteer-profiles/');
+//api for getting donation and expense totals per bucket (params: bucket, from, to)
+api.getFundsTimeSeries = (params = {}) => api.get('/api/funds/timeseries/', { params });
+
+//api for getting one page of volunteer profiles (filters: status, town, role, search, page_size)
+api.getVolunteerProfiles = (params = {}) => api.get('/api/volunteer-profiles/', { params });
+
+//api for getting the logged in user's own profile
+api.getMyProfile = () => api.get('/api/volunteer-profiles/me/');
+
+//api for getting a page of news, newest first ({ type, animal, page_size })
+api.getNews = (params = {}) => api.get('/api/news/', { params });
+
+//api for getting the latest news for the public site, no login needed ({ type, limit })
+api.getPublicNews = (params = {}) => api.get('/api/public/news/', { params });
+
+//api for getting the animals up for adoption for the public site, no login needed
+api.getAdoptableAnimals = () => api.get('/api/public/animals/');
 
 //api for getting animals
 api.getAnimals = () => api.get('/api/animals/');
 
+//api for getting the animals assigned to the logged in caregiver, with counts per status
+api.getMyAnimals = (params = {}) => api.get('/api/animals/mine/', { params });
+
+//api for getting the number of animals assigned to each caregiver
+api.getCaregiverWorkload = () => api.get('/api/animals/workload/');
+
+//api for updating status, needs_review or caregiver on many animals at once ({ ids | filter, ...changes })
+api.bulkUpdateAnimals = (data) => api.patch('/api/animals/bulk-update/', data);
+
 //api for creating expenses
 api.createExpense = (data) => api.post('/api/expenses/', data);
 
@@ -42,4 +105,7 @@ api.getUserStatusChoices = () => api.get('/api/choices/user-status/');
 //api for updating volunteer profile status
 api.updateVolunteerProfileStatus = (userId, newStatus) => api.patch(`/api/volunteer-profiles/user/${userId}/`, { status: newStatus });
 
+//api for full-text search across news, notes and messages ({ q, types, limit })
+api.search = (params) => api.get('/api/search/', { params });
+
 export default api;
\ No newline at end of file
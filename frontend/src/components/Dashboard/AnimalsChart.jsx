@@ -11,11 +11,9 @@ const AnimalsChart = () => {
     useEffect(() => {
         const fetchAnimalData = async () => {
             try {
-                const response = await api.getAnimals();
-                // Filter animals to only include those that don't need review
-                const filteredAnimals = response.data.filter(animal => animal.needs_review === false);
-                // Process animal data to count by month
-                const animalsByMonth = processAnimalData(filteredAnimals);
+                const response = await api.getDashboardSummary({ news: 0 });
+                // Monthly counts of approved animals are computed by the backend
+                const animalsByMonth = processAnimalData(response.data.animals.approved_by_month);
                 setAnimalsData(animalsByMonth);
             } catch (error) {
                 console.error("Failed to fetch animal data:", error);
@@ -27,42 +25,14 @@ const AnimalsChart = () => {
         fetchAnimalData();
     }, []);
 
-    // Function to process animal data and count animals by month
+    // Function to convert the monthly counts into chart data
     const processAnimalData = (data) => {
-        const now = new Date(); // Get the current date
         const monthNames = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
-        
-        // Hold the count of new animals for each month
-        const monthCounts = {};
-        for (let i = 7; i >= 0; i--) {
-            const monthIndex = (now.getMonth() - i + 12) % 12; // Calculate the month index
-            // Get the month name and initialize the count to 0
-            const monthName = monthNames[monthIndex];
-            monthCounts[monthName] = 0;
-        }
-        
-        // Iterate over the data to count animals added in each month
-        data.forEach((animal) => {
-            if (animal.date_added) {
-                const addedDate = new Date(animal.date_added);
-                const monthName = monthNames[addedDate.getMonth()];
-                
-                // Calculate the difference in months between now and when the animal was added
-                const monthsDiff = 
-                    (now.getFullYear() - addedDate.getFullYear()) * 12 + 
-                    (now.getMonth() - addedDate.getMonth());
-                
-                // Only count animals added in the last 8 months
-                if (monthsDiff <= 7 && monthsDiff >= 0) {
-                    monthCounts[monthName] = (monthCounts[monthName] || 0) + 1;
-                }
-            }
-        });
-        
-        // Convert to array format for the chart
-        return Object.keys(monthCounts).map(month => ({
-            name: month,
-            newAnimals: monthCounts[month]
+
+        // Months are "YYYY-MM-DD" strings for the first day of each month
+        return data.map(({ month, count }) => ({
+            name: monthNames[parseInt(month.slice(5, 7), 10) - 1],
+            newAnimals: count
         }));
     };
 
@@ -11,12 +11,11 @@ const DonationsChart = () => {
     const fetchDonationData = useCallback(async () => {
         try {
             setLoading(true);
-            // Get donations and expenses for the last 8 months
-            const donations = await api.get('/api/donations/', { params: { months: 8 } });
-            const expenses = await api.get('/api/expenses/', { params: { months: 8 } });
-            
-            // Process donation and expense data by month
-            const processedData = processFinancialData(donations.data, expenses.data);
+            // Get monthly donation and expense totals for the last 8 months
+            const response = await api.getFundsTimeSeries({ bucket: 'month' });
+
+            // Process donation and expense totals by month
+            const processedData = processFinancialData(response.data.results);
             setDonationData(processedData);
         } catch (error) {
             console.error("Failed to fetch donation data:", error);
@@ -46,55 +45,16 @@ const DonationsChart = () => {
         };
     }, [fetchDonationData]); // Re-run effect when fetchDonationData changes
 
-    // Process donation and expense data by month
-    const processFinancialData = (donationsData, expensesData) => {
-        const now = new Date(); // Get current date
+    // Convert the monthly totals into chart data
+    const processFinancialData = (results) => {
         const monthNames = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
-        
-        // Initialize monthly data object
-        const monthlyData = {};
-        for (let i = 7; i >= 0; i--) {
-            const monthIndex = (now.getMonth() - i + 12) % 12; // Calculate month index
-            const monthName = monthNames[monthIndex];
-            monthlyData[monthName] = { name: monthName, donations: 0, expenses: 0 };
-        }
-        
-        // Iterate over donations to process by month
-        donationsData.forEach(donation => {
-            if (donation.timestamp) {
-                const date = new Date(donation.timestamp);
-                const monthName = monthNames[date.getMonth()];
-                
-                // Only include data from last 8 months
-                const monthsDiff = 
-                    (now.getFullYear() - date.getFullYear()) * 12 + 
-                    (now.getMonth() - date.getMonth());
-                    
-                if (monthsDiff <= 7 && monthsDiff >= 0 && monthlyData[monthName]) {
-                    monthlyData[monthName].donations += donation.usd_amount;
-                }
-            }
-        });
-        
-        // Process expenses
-        expensesData.forEach(expense => {
-            if (expense.timestamp) {
-                const date = new Date(expense.timestamp);
-                const monthName = monthNames[date.getMonth()];
-                
-                // Only include data from last 8 months
-                const monthsDiff = 
-                    (now.getFullYear() - date.getFullYear()) * 12 + 
-                    (now.getMonth() - date.getMonth());
-                    
-                if (monthsDiff <= 7 && monthsDiff >= 0 && monthlyData[monthName]) {
-                    monthlyData[monthName].expenses += expense.usd_amount;
-                }
-            }
-        });
-        
-        // Convert to array format for chart
-        return Object.values(monthlyData);
+
+        // Periods are "YYYY-MM-DD" strings for the first day of each month
+        return results.map(({ period, donations, expenses }) => ({
+            name: monthNames[parseInt(period.slice(5, 7), 10) - 1],
+            donations,
+            expenses
+        }));
     };
 
     return (
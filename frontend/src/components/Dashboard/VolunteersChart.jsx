@@ -11,9 +11,9 @@ const VolunteersChart = () => {
 	useEffect(() => {
 		const fetchVolunteerData = async () => {
 			try {
-				const response = await api.getVolunteerProfiles();
-				// Process volunteer data to count by month
-				const volunteersByMonth = processVolunteerData(response.data);
+				const response = await api.getDashboardSummary({ news: 0 });
+				// Monthly counts of new volunteers are computed by the backend
+				const volunteersByMonth = processVolunteerData(response.data.volunteers.joined_by_month);
 				setVolunteersData(volunteersByMonth);
 			} catch (error) {
 				console.error("Failed to fetch volunteer data:", error);
@@ -26,47 +26,14 @@ const VolunteersChart = () => {
 	}, []);
 
 	
-	// Function to process volunteer data and count volunteers by month
+	// Function to convert the monthly counts into chart data
 	const processVolunteerData = (data) => {
-		const now = new Date(); // Get the current date
 		const monthNames = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
-		
-		// Hold the count of volunteers for each month
-		const monthCounts = {};
-		for (let i = 7; i >= 0; i--) {
-			const monthIndex = (now.getMonth() - i + 12) % 12; // Calculate the month index
-			// Get the month name and initialize the count to 0
-			const monthName = monthNames[monthIndex];
-			monthCounts[monthName] = 0;
-		}
-		
-		// Iterate over the data to only count volunteers
-		data.forEach((profile) => {
-			const isVolunteer = profile?.user?.roles?.includes('volunteer') || false;
-			if (!isVolunteer) {
-				return;
-			}
-			// Check when the date user joined as a volunteer
-			if (profile.user && profile.user.date_joined) {
-				const joinDate = new Date(profile.user.date_joined);
-				const monthName = monthNames[joinDate.getMonth()];
-				
-				// Calculate the difference in current month and the month they joined
-				const monthsDiff = 
-					(now.getFullYear() - joinDate.getFullYear()) * 12 + 
-					(now.getMonth() - joinDate.getMonth());
-				
-				// Will only display volunteers who joined in the last 8 months
-				if (monthsDiff <= 7 && monthsDiff >= 0) {
-					monthCounts[monthName] = (monthCounts[monthName] || 0) + 1;
-				}
-			}
-		});
-		
-		// Convert to array format data for the chart
-		return Object.keys(monthCounts).map(month => ({
-			name: month,
-			volunteers: monthCounts[month]
+
+		// Months are "YYYY-MM-DD" strings for the first day of each month
+		return data.map(({ month, count }) => ({
+			name: monthNames[parseInt(month.slice(5, 7), 10) - 1],
+			volunteers: count
 		}));
 	};
 
@@ -10,18 +10,10 @@ function RoleBasedRoute({ children, allowedRoles = [] }) {
   const [redirecting, setRedirecting] = useState(false);
 
   useEffect(() => {
-    // Get user roles from API
+    // Get user roles, from the access token when possible
     const fetchUserRoles = async () => {
       try {
-        const response = await api.get("/api/user/roles/");
-
-        if (!response || !response.data) {
-          console.error("Invalid response from roles API");
-          setHasRequiredRole(false);
-          return;
-        }
-
-        const roles = response.data.roles || [];
+        const roles = await api.getUserRoles();
         console.log(`User roles: ${JSON.stringify(roles)}`);
 
         setUserRoles(roles);
@@ -8,28 +8,29 @@ const MembersTable = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [members, setMembers] = useState([]);
-  const [filteredMembers, setFilteredMembers] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [editingUserId, setEditingUserId] = useState(null);
 
   // Define status choices directly based on the UserStatus model in backend
   const statusOptions = ["active", "inactive", "temporary leave"];
 
-  // Fetch members data
-  const fetchMembers = async () => {
+  const toMember = (profile) => ({
+    id: profile.user.id,
+    name: profile.user.username,
+    email: profile.user.email,
+    role: profile.user.roles[0],
+    status: profile.status,
+    profileId: profile.id // This is the actual profile ID needed for updates
+  });
+
+  // Fetch the first page of members matching the search term.
+  // Searching is done by the backend so only one page is ever downloaded.
+  const fetchMembers = async (term) => {
     try {
       setLoading(true);
-      const response = await api.getVolunteerProfiles();
-      const profiles = response.data.map((profile) => ({
-        id: profile.user.id,
-        name: profile.user.username,
-        email: profile.user.email,
-        role: profile.user.roles[0],
-        status: profile.status,
-        profileId: profile.id // This is the actual profile ID needed for updates
-      }));
-
-      setMembers(profiles);
-      setFilteredMembers(profiles);
+      const response = await api.getVolunteerProfiles(term ? { search: term } : {});
+      setMembers(response.data.results.map(toMember));
+      setNextPage(response.data.next);
     } catch (err) {
       console.error("Error fetching members:", err);
       setError("Failed to load members");
@@ -38,23 +39,27 @@ const MembersTable = () => {
     }
   };
 
+  // Append the next page of members to the table
+  const loadMoreMembers = async () => {
+    try {
+      const response = await api.get(nextPage);
+      setMembers((current) => [...current, ...response.data.results.map(toMember)]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error("Error fetching members:", err);
+      setError("Failed to load members");
+    }
+  };
+
+  // Debounce the search so typing doesn't send a request per keystroke
   useEffect(() => {
-    fetchMembers();
-  }, []);
+    const timeout = setTimeout(() => fetchMembers(searchTerm), 300);
+    return () => clearTimeout(timeout);
+  }, [searchTerm]);
 
   // Handle search
   const handleSearch = (e) => {
-    const term = e.target.value.toLowerCase();
-    setSearchTerm(term);
-
-    const filtered = members.filter(
-      (member) =>
-        member.name.toLowerCase().includes(term) ||
-        member.email.toLowerCase().includes(term) ||
-        member.role.toLowerCase().includes(term)
-    );
-
-    setFilteredMembers(filtered);
+    setSearchTerm(e.target.value.toLowerCase());
   };
 
   // Update user status
@@ -73,16 +78,6 @@ const MembersTable = () => {
 
       setMembers(updatedMembers);
 
-      // Also update the filtered members to maintain consistency in the UI
-      setFilteredMembers(
-        updatedMembers.filter(
-          (member) =>
-            member.name.toLowerCase().includes(searchTerm) ||
-            member.email.toLowerCase().includes(searchTerm) ||
-            member.role.toLowerCase().includes(searchTerm)
-        )
-      );
-
       // Close the dropdown after successful update
       setEditingUserId(null);
     } catch (err) {
@@ -109,14 +104,6 @@ const MembersTable = () => {
         // Update local state to remove the deleted member
         const updatedMembers = members.filter((member) => member.id !== userId);
         setMembers(updatedMembers);
-        setFilteredMembers(
-          updatedMembers.filter(
-            (member) =>
-              member.name.toLowerCase().includes(searchTerm) ||
-              member.email.toLowerCase().includes(searchTerm) ||
-              member.role.toLowerCase().includes(searchTerm)
-          )
-        );
       } catch (err) {
         console.error("Error deleting member:", err);
         alert("Failed to delete member. Please try again.");
@@ -187,8 +174,8 @@ const MembersTable = () => {
               </tr>
             </thead>
             <tbody className="bg-gray-800 divide-y divide-gray-700">
-              {filteredMembers.length > 0 ? (
-                filteredMembers.map((member) => (
+              {members.length > 0 ? (
+                members.map((member) => (
                   <motion.tr
                     key={member.id}
                     initial={{ opacity: 0 }}
@@ -271,6 +258,16 @@ const MembersTable = () => {
               )}
             </tbody>
           </table>
+          {nextPage && (
+            <div className="p-4 text-center">
+              <button
+                className="text-indigo-400 hover:text-indigo-300 text-sm font-medium"
+                onClick={loadMoreMembers}
+              >
+                Load more members
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>